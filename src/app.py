@@ -57,7 +57,6 @@ def get_services():
         'validation_engine': ValidationEngine(),
         'aggregation_engine': AggregationEngine(),
         'report_generator': ReportGenerator(),
-        'dashboard': Dashboard(),
         'session_manager': SessionManager()
     }
 
@@ -82,6 +81,10 @@ def init_session_state():
         st.session_state.processing_stats = None
     if 'processing_logs' not in st.session_state:
         st.session_state.processing_logs = []
+    # Per session, not a shared service: it caches a column view of this
+    # session's accounts
+    if 'dashboard' not in st.session_state:
+        st.session_state.dashboard = Dashboard()
 
 
 def render_sidebar():
@@ -398,7 +401,7 @@ def render_processing_page():
     data_processor = services['data_processor']
     validation_engine = services['validation_engine']
     aggregation_engine = services['aggregation_engine']
-    dashboard = services['dashboard']
+    dashboard = st.session_state.dashboard
     
     if st.session_state.uploaded_df is None or st.session_state.column_mapping is None:
         st.warning("Please complete the previous steps first.")
@@ -541,7 +544,7 @@ def render_processing_page():
 def render_results_page():
     """Render the results dashboard with statistics, downloads, and filters."""
     services = get_services()
-    dashboard = services['dashboard']
+    dashboard = st.session_state.dashboard
     report_generator = services['report_generator']
     
     if st.session_state.aggregated_accounts is None:
@@ -773,17 +776,13 @@ def render_results_page():
             help="Filter accounts with at least this total amount"
         )
     
-    # Apply filters
-    filtered_accounts = accounts
-    
-    if search_query:
-        filtered_accounts = dashboard.search_accounts(filtered_accounts, search_query)
-    
-    if min_transactions > 0:
-        filtered_accounts = dashboard.filter_by_min_transactions(filtered_accounts, min_transactions)
-    
-    if min_amount > 0:
-        filtered_accounts = dashboard.filter_by_min_amount(filtered_accounts, min_amount)
+    # Apply filters (fused into one vectorized pass)
+    filtered_accounts = dashboard.filter_accounts(
+        accounts,
+        query=search_query,
+        min_transactions=min_transactions,
+        min_amount=min_amount
+    )
     
     # Show filter results count
     st.info(f"Showing {len(filtered_accounts)} of {len(accounts)} accounts")
@@ -6,8 +6,24 @@ Calculates time differences between call date and entry date.
 import streamlit as st
 import pandas as pd
 from io import BytesIO
-from datetime import datetime, timedelta
+from datetime import datetime
+from decimal import Decimal, ROUND_DOWN
+from pathlib import Path
+from typing import Optional
+import atexit
+import hashlib
+import os
 import re
+import shutil
+import tempfile
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from src.file_cache import evict_files, mark_used
+from src.file_readers import EXCEL_READ_ENGINE, read_csv_as_text, write_streamed_workbook
+
+_NON_DIGIT = re.compile(r'\D')
 
 
 def normalize_mobile(mobile):
@@ -25,7 +41,6 @@ def normalize_mobile(mobile):
     if 'e' in mobile_str.lower():
         try:
             # Use Decimal for precision with large numbers
-            from decimal import Decimal, ROUND_DOWN
             mobile_str = str(int(Decimal(mobile_str).to_integral_value(rounding=ROUND_DOWN)))
         except:
             try:
@@ -42,7 +57,7 @@ def normalize_mobile(mobile):
             mobile_str = mobile_str.split('.')[0]
     
     # Remove any non-digit characters (spaces, dashes, brackets, etc.)
-    mobile_str = re.sub(r'\D', '', mobile_str)
+    mobile_str = _NON_DIGIT.sub('', mobile_str)
     
     # Extract last 10 digits only
     if len(mobile_str) >= 10:
@@ -151,6 +166,31 @@ def format_datetime_output(dt):
         return str(dt)
 
 
+def format_datetime_series(series):
+    """Format a datetime Series as DD-MM-YYYY HH:MM in one vectorized pass (NaT -> None)."""
+    series = pd.to_datetime(series, errors='coerce')
+    formatted = series.dt.strftime('%d-%m-%Y %H:%M').astype(object)
+    return formatted.where(series.notna(), None)
+
+
+def _map_unique(series, func):
+    """Run func once per distinct non-null value and broadcast results back to every row."""
+    uniques = series.dropna().unique()
+    return series.map(dict(zip(uniques, map(func, uniques))))
+
+
+def normalize_mobile_series(series):
+    """Normalize a column of mobile numbers (normalize_mobile once per distinct value)."""
+    # map() gives float64 for empty or all-blank input; keep a text column
+    return _map_unique(series, normalize_mobile).astype(object)
+
+
+def parse_datetime_series(series):
+    """Parse a column of dates (parse_datetime once per distinct value)."""
+    # map() gives float64 for empty or all-blank input; keep datetime64
+    return pd.to_datetime(_map_unique(series, parse_datetime), errors='coerce')
+
+
 def validate_mobile(mobile):
     """Validate that mobile number is exactly 10 digits."""
     if mobile is None or pd.isna(mobile):
@@ -159,6 +199,265 @@ def validate_mobile(mobile):
     return len(mobile_str) == 10 and mobile_str.isdigit()
 
 
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_file_cached(file_content: bytes, filename: str) -> pd.DataFrame:
+    """Read uploaded file with caching so reruns don't re-parse it."""
+    buffer = BytesIO(file_content)
+    if filename.endswith('.csv'):
+        # All text, so dates, mobiles and ACKs all go through the normalizers
+        # whatever the other rows of a column look like
+        return read_csv_as_text(buffer)
+    else:
+        # calamine is much faster than openpyxl when python-calamine is installed
+        return pd.read_excel(buffer, engine=EXCEL_READ_ENGINE)
+
+
+def _hash_dataframe(df: pd.DataFrame):
+    """Cheap cache key for a DataFrame: shape, column names and pandas' row hashes."""
+    return (
+        df.shape,
+        tuple(str(col) for col in df.columns),
+        int(pd.util.hash_pandas_object(df, index=False).sum())
+    )
+
+
+def generate_excel_bytes(df: pd.DataFrame, sheet_name: str = 'Matched Records',
+                         average_time_difference: str = None) -> bytes:
+    """
+    Generate Excel file bytes for matched records.
+    The average time difference, if given, goes on a separate Summary sheet.
+    """
+    extra_sheets = None
+    if average_time_difference is not None:
+        extra_sheets = {'Summary': [['Average Time Difference'], [average_time_difference]]}
+    return write_streamed_workbook(df, sheet_name, extra_sheets)
+
+
+# Matched results hold mobile numbers, so they are written to a directory
+# private to this process (0o700, files 0o600) that is removed at exit.
+# Results unused for MATCH_CACHE_MAX_AGE_SECONDS are deleted, and least
+# recently used files go past the size cap.
+MATCH_CACHE_MAX_BYTES = 1024 ** 3
+MATCH_CACHE_MAX_AGE_SECONDS = 4 * 60 * 60
+
+_match_cache_dir: Optional[Path] = None
+
+
+def _get_match_cache_dir() -> Path:
+    """Return the private directory for persisted matches, creating it on first use."""
+    global _match_cache_dir
+    if _match_cache_dir is None:
+        # mkdtemp creates the directory readable only by this user
+        _match_cache_dir = Path(tempfile.mkdtemp(prefix="call_notice_matches_"))
+        atexit.register(shutil.rmtree, _match_cache_dir, ignore_errors=True)
+    return _match_cache_dir
+
+
+def persist_matches(df: pd.DataFrame) -> str:
+    """
+    Write matched results to a private Parquet file named by content hash.
+    Session state keeps only the path; downloads are built from the file on demand.
+    """
+    cache_dir = _get_match_cache_dir()
+    key = hashlib.blake2b(repr(_hash_dataframe(df)).encode(), digest_size=16).hexdigest()
+    path = cache_dir / f"cnm_match_{key}.parquet"
+    if path.exists():
+        mark_used(path)
+    else:
+        # Write under a unique 0o600 temp name so a download never reads a partial file
+        fd, temp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        os.close(fd)
+        temp_path = Path(temp_name)
+        try:
+            try:
+                df.to_parquet(temp_path, index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed-type object columns (e.g. numeric and text ACK numbers) are stored as text
+                text_cols = df.select_dtypes(include='object').columns
+                df.astype({col: 'string' for col in text_cols}).to_parquet(temp_path, index=False)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+    
+    evict_files(cache_dir, "*.parquet", MATCH_CACHE_MAX_BYTES, MATCH_CACHE_MAX_AGE_SECONDS, keep=path)
+    return str(path)
+
+
+def generate_excel_from_parquet(path: str, average_time_difference: str = None) -> bytes:
+    """
+    Generate Excel download bytes from a persisted Parquet result.
+    Not cached: the bytes are built per click and freed once sent.
+    """
+    return generate_excel_bytes(pd.read_parquet(path), average_time_difference=average_time_difference)
+
+
+def generate_csv_from_parquet(path: str) -> bytes:
+    """
+    Generate CSV download bytes from a persisted Parquet result using Arrow's CSV writer.
+    Not cached: the bytes are built per click and freed once sent.
+    """
+    output = pa.BufferOutputStream()
+    pa_csv.write_csv(pq.read_table(path), output)
+    return output.getvalue().to_pybytes()
+
+
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs={pd.DataFrame: _hash_dataframe})
+def compute_matches(df1, df2, phone_col_file1, call_date_col, phone_col_file2, entry_date_col, ack_col):
+    """
+    Match call records (File 1) with entry records (File 2) on normalized mobile number.
+    Returns (output_df, warnings, stats); cached so identical inputs are not reprocessed.
+    """
+    # Create narrow working copies with only the columns the pipeline reads
+    df1 = df1[list(dict.fromkeys([phone_col_file1, call_date_col]))].copy()
+    df2 = df2[list(dict.fromkeys([phone_col_file2, entry_date_col, ack_col]))].copy()
+    
+    # Step 1: Normalize mobile numbers
+    df1['normalized_mobile'] = normalize_mobile_series(df1[phone_col_file1])
+    df2['normalized_mobile'] = normalize_mobile_series(df2[phone_col_file2])
+    
+    # Track data quality issues
+    warnings = []
+    
+    # Check for invalid mobile numbers (one boolean mask per file, reused for filtering)
+    valid_mask1 = df1['normalized_mobile'].str.match(r'^\d{10}$', na=False).astype(bool)
+    valid_mask2 = df2['normalized_mobile'].str.match(r'^\d{10}$', na=False).astype(bool)
+    invalid_mobile_file1 = int((~valid_mask1).sum())
+    invalid_mobile_file2 = int((~valid_mask2).sum())
+    
+    if invalid_mobile_file1 > 0:
+        warnings.append(f"⚠️ File 1: {invalid_mobile_file1} records with invalid mobile numbers (excluded)")
+    if invalid_mobile_file2 > 0:
+        warnings.append(f"⚠️ File 2: {invalid_mobile_file2} records with invalid mobile numbers (excluded)")
+    
+    # Step 2: Filter valid mobile numbers only
+    df1_valid = df1[valid_mask1].copy()
+    df2_valid = df2[valid_mask2].copy()
+    
+    # Encode mobiles with one shared categorical dtype so dedup/join hash aligned integer codes
+    mobile_dtype = pd.CategoricalDtype(
+        pd.unique(pd.concat([df1_valid['normalized_mobile'], df2_valid['normalized_mobile']]))
+    )
+    df1_valid['normalized_mobile'] = df1_valid['normalized_mobile'].astype(mobile_dtype)
+    df2_valid['normalized_mobile'] = df2_valid['normalized_mobile'].astype(mobile_dtype)
+    
+    # Step 3: Parse dates
+    df1_valid['parsed_call_date'] = parse_datetime_series(df1_valid[call_date_col])
+    df2_valid['parsed_entry_date'] = parse_datetime_series(df2_valid[entry_date_col])
+    
+    # Check for unparseable dates
+    unparsed_call = df1_valid['parsed_call_date'].isna().sum()
+    unparsed_entry = df2_valid['parsed_entry_date'].isna().sum()
+    
+    if unparsed_call > 0:
+        warnings.append(f"⚠️ File 1: {unparsed_call} records with unparseable call dates")
+    if unparsed_entry > 0:
+        warnings.append(f"⚠️ File 2: {unparsed_entry} records with unparseable entry dates")
+    
+    # Step 4: Prepare data for merge
+    # KEEP ONLY FIRST CALL for each mobile number (remove duplicates)
+    df1_for_merge = (
+        df1_valid[['normalized_mobile', 'parsed_call_date']]
+        .drop_duplicates(subset='normalized_mobile', keep='first')
+        .reset_index(drop=True)
+    )
+    
+    # Count duplicates removed
+    duplicates_removed = len(df1_valid) - len(df1_for_merge)
+    if duplicates_removed > 0:
+        warnings.append(f"ℹ️ File 1: {duplicates_removed} duplicate calls removed (kept first call only)")
+    
+    df2_for_merge = df2_valid[['normalized_mobile', ack_col, 'parsed_entry_date']].rename(columns={ack_col: 'ack_no'})
+    # Also remove duplicates from File 2 if any (keep first entry)
+    df2_before_dedup = len(df2_for_merge)
+    df2_for_merge = (
+        df2_for_merge
+        .drop_duplicates(subset='normalized_mobile', keep='first')
+        .reset_index(drop=True)
+    )
+    df2_duplicates = df2_before_dedup - len(df2_for_merge)
+    
+    if df2_duplicates > 0:
+        warnings.append(f"ℹ️ File 2: {df2_duplicates} duplicate entries removed (kept first entry only)")
+    
+    # Step 5: Perform INNER JOIN on normalized mobile numbers
+    # Both sides are unique per mobile, so an index join avoids merge's key materialization
+    merged = (
+        df1_for_merge.set_index('normalized_mobile')
+        .join(df2_for_merge.set_index('normalized_mobile'), how='inner')
+        .reset_index()
+    )
+    
+    # Step 6: Calculate time difference with precision
+    # (coerced so a side with no parsed dates still subtracts as datetime64)
+    entry_dates = pd.to_datetime(merged['parsed_entry_date'], errors='coerce')
+    call_dates = pd.to_datetime(merged['parsed_call_date'], errors='coerce')
+    merged['time_diff'] = pd.to_timedelta(entry_dates - call_dates)
+    
+    # Step 7: Create final output dataframe
+    output_df = pd.DataFrame({
+        'Sr. No.': range(1, len(merged) + 1),
+        'Acknowledgement No.': merged['ack_no'],
+        'Mobile Number': merged['normalized_mobile'].astype(object),
+        'Call Date': format_datetime_series(merged['parsed_call_date']),
+        'Entry Date': format_datetime_series(merged['parsed_entry_date']),
+        'Time Difference': merged['time_diff'].apply(format_time_difference)
+    })
+    
+    # Calculate average time difference (reported separately, not as a footer row)
+    avg_timedelta = merged['time_diff'].mean()
+    avg_formatted = format_time_difference(avg_timedelta) if pd.notna(avg_timedelta) else None
+    
+    # Calculate unique mobiles that didn't match (hashed Index set ops)
+    file1_mobiles = pd.Index(df1_valid['normalized_mobile'].dropna().unique())
+    file2_mobiles = pd.Index(df2_valid['normalized_mobile'].dropna().unique())
+    
+    # Sample rows for calculation verification
+    verify_df = merged.head(5).copy()
+    verify_df['Call Date Raw'] = verify_df['parsed_call_date']
+    verify_df['Entry Date Raw'] = verify_df['parsed_entry_date']
+    verify_df['Time Diff (seconds)'] = verify_df['time_diff'].apply(
+        lambda x: x.total_seconds() if x is not None and pd.notna(x) else None
+    )
+    verify_df['Time Diff Formatted'] = verify_df['time_diff'].apply(format_time_difference)
+    
+    stats = {
+        'matched_count': len(merged),
+        'avg_time_difference': avg_formatted,
+        'unmatched_file1': len(file1_mobiles.difference(file2_mobiles)),
+        'unmatched_file2': len(file2_mobiles.difference(file1_mobiles)),
+        'verify_df': verify_df[['normalized_mobile', 'Call Date Raw', 'Entry Date Raw',
+                                'Time Diff (seconds)', 'Time Diff Formatted']]
+    }
+    
+    return output_df, warnings, stats
+
+
+def _normalized_preview(df: pd.DataFrame, phone_col: str, date_col: str, rows: int = 10) -> pd.DataFrame:
+    """Build the sample table of raw vs normalized mobile numbers and parsed dates."""
+    sample = df[[phone_col, date_col]].head(rows)
+    return sample.assign(**{
+        'Normalized Mobile': normalize_mobile_series(sample[phone_col]),
+        'Parsed Date': format_datetime_series(parse_datetime_series(sample[date_col]))
+    })
+
+
+def _update_file_meta(key: str, uploaded_file, df: pd.DataFrame, raw: bytes) -> None:
+    """Store file metadata in session state; clear stale match results if the file changed."""
+    file_hash = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    previous = st.session_state.get(key)
+    if previous is not None and previous['hash'] != file_hash:
+        st.session_state.cnm_matched_path = None
+        st.session_state.cnm_matched_rows = 0
+        st.session_state.cnm_matched_preview = None
+        st.session_state.cnm_avg_time_diff = None
+    st.session_state[key] = {
+        'name': uploaded_file.name,
+        'hash': file_hash,
+        'columns': df.columns.tolist(),
+        'nrows': len(df)
+    }
+
+
 def render_call_notice_merge_page():
     """Render the Call Notice Data Merge page."""
     
@@ -166,16 +465,25 @@ def render_call_notice_merge_page():
     st.markdown("Match records from two Excel files based on mobile numbers and calculate time differences.")
     
     # Initialize session state for this page
-    if 'cnm_file1_df' not in st.session_state:
-        st.session_state.cnm_file1_df = None
-    if 'cnm_file2_df' not in st.session_state:
-        st.session_state.cnm_file2_df = None
-    if 'cnm_matched_df' not in st.session_state:
-        st.session_state.cnm_matched_df = None
+    # Only lightweight file metadata is kept in session state; the DataFrames
+    # themselves come from read_file_cached on demand
+    if 'cnm_file1_meta' not in st.session_state:
+        st.session_state.cnm_file1_meta = None
+    if 'cnm_file2_meta' not in st.session_state:
+        st.session_state.cnm_file2_meta = None
+    if 'cnm_matched_path' not in st.session_state:
+        st.session_state.cnm_matched_path = None
+        st.session_state.cnm_matched_rows = 0
+        st.session_state.cnm_matched_preview = None
+    if 'cnm_avg_time_diff' not in st.session_state:
+        st.session_state.cnm_avg_time_diff = None
     
     # File Upload Section
     st.header("📁 Upload Files")
     
+    file1_df = None
+    file2_df = None
+    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -184,16 +492,17 @@ def render_call_notice_merge_page():
         
         if file1:
             try:
-                if file1.name.endswith('.csv'):
-                    st.session_state.cnm_file1_df = pd.read_csv(file1)
-                else:
-                    st.session_state.cnm_file1_df = pd.read_excel(file1)
-                st.success(f"✅ Loaded {len(st.session_state.cnm_file1_df)} records")
+                raw = file1.getvalue()
+                file1_df = read_file_cached(raw, file1.name)
+                _update_file_meta('cnm_file1_meta', file1, file1_df, raw)
+                st.success(f"✅ Loaded {len(file1_df)} records")
                 
                 with st.expander("Preview Call Data", expanded=True):
-                    st.dataframe(st.session_state.cnm_file1_df.head(10), use_container_width=True)
+                    st.dataframe(file1_df.head(10), use_container_width=True)
             except Exception as e:
                 st.error(f"❌ Error reading file: {str(e)}")
+        else:
+            st.session_state.cnm_file1_meta = None
     
     with col2:
         st.subheader("File 2: Entry Data")
@@ -201,25 +510,26 @@ def render_call_notice_merge_page():
         
         if file2:
             try:
-                if file2.name.endswith('.csv'):
-                    st.session_state.cnm_file2_df = pd.read_csv(file2)
-                else:
-                    st.session_state.cnm_file2_df = pd.read_excel(file2)
-                st.success(f"✅ Loaded {len(st.session_state.cnm_file2_df)} records")
+                raw = file2.getvalue()
+                file2_df = read_file_cached(raw, file2.name)
+                _update_file_meta('cnm_file2_meta', file2, file2_df, raw)
+                st.success(f"✅ Loaded {len(file2_df)} records")
                 
                 with st.expander("Preview Entry Data", expanded=True):
-                    st.dataframe(st.session_state.cnm_file2_df.head(10), use_container_width=True)
+                    st.dataframe(file2_df.head(10), use_container_width=True)
             except Exception as e:
                 st.error(f"❌ Error reading file: {str(e)}")
+        else:
+            st.session_state.cnm_file2_meta = None
     
     # Column Selection Section
-    if st.session_state.cnm_file1_df is not None and st.session_state.cnm_file2_df is not None:
+    if file1_df is not None and file2_df is not None:
         st.header("🔧 Column Selection")
         
         col1, col2 = st.columns(2)
         
-        file1_columns = st.session_state.cnm_file1_df.columns.tolist()
-        file2_columns = st.session_state.cnm_file2_df.columns.tolist()
+        file1_columns = st.session_state.cnm_file1_meta['columns']
+        file2_columns = st.session_state.cnm_file2_meta['columns']
         
         with col1:
             st.subheader("File 1 Columns (Call Data)")
@@ -255,130 +565,35 @@ def render_call_notice_merge_page():
         # Process and Match Button
         st.header("🔄 Process Data")
         
-        # Debug preview section
-        with st.expander("🔍 Preview Normalized Data (Verify Before Matching)", expanded=False):
+        # Debug preview section - only computed when the user asks for it
+        if st.checkbox("🔍 Preview Normalized Data (Verify Before Matching)", key='cnm_show_preview'):
             col_debug1, col_debug2 = st.columns(2)
             
             with col_debug1:
                 st.write("**File 1 - Sample Mobile Numbers & Dates:**")
-                sample_df1 = st.session_state.cnm_file1_df[[phone_col_file1, call_date_col]].head(10).copy()
-                sample_df1['Normalized Mobile'] = sample_df1[phone_col_file1].apply(normalize_mobile)
-                sample_df1['Parsed Date'] = sample_df1[call_date_col].apply(parse_datetime)
-                sample_df1['Parsed Date'] = sample_df1['Parsed Date'].apply(format_datetime_output)
-                st.dataframe(sample_df1, use_container_width=True)
+                st.dataframe(_normalized_preview(file1_df, phone_col_file1, call_date_col), use_container_width=True)
             
             with col_debug2:
                 st.write("**File 2 - Sample Mobile Numbers & Dates:**")
-                sample_df2 = st.session_state.cnm_file2_df[[phone_col_file2, entry_date_col]].head(10).copy()
-                sample_df2['Normalized Mobile'] = sample_df2[phone_col_file2].apply(normalize_mobile)
-                sample_df2['Parsed Date'] = sample_df2[entry_date_col].apply(parse_datetime)
-                sample_df2['Parsed Date'] = sample_df2['Parsed Date'].apply(format_datetime_output)
-                st.dataframe(sample_df2, use_container_width=True)
+                st.dataframe(_normalized_preview(file2_df, phone_col_file2, entry_date_col), use_container_width=True)
         
         if st.button("Match Records", type="primary", use_container_width=True, key="cnm_match_btn"):
             with st.spinner("Processing data..."):
                 try:
-                    # Create working copies
-                    df1 = st.session_state.cnm_file1_df.copy()
-                    df2 = st.session_state.cnm_file2_df.copy()
-                    
-                    # Step 1: Normalize mobile numbers
-                    df1['normalized_mobile'] = df1[phone_col_file1].apply(normalize_mobile)
-                    df2['normalized_mobile'] = df2[phone_col_file2].apply(normalize_mobile)
-                    
-                    # Track data quality issues
-                    warnings = []
-                    
-                    # Check for invalid mobile numbers
-                    invalid_mobile_file1 = df1[~df1['normalized_mobile'].apply(validate_mobile)]
-                    invalid_mobile_file2 = df2[~df2['normalized_mobile'].apply(validate_mobile)]
-                    
-                    if len(invalid_mobile_file1) > 0:
-                        warnings.append(f"⚠️ File 1: {len(invalid_mobile_file1)} records with invalid mobile numbers (excluded)")
-                    if len(invalid_mobile_file2) > 0:
-                        warnings.append(f"⚠️ File 2: {len(invalid_mobile_file2)} records with invalid mobile numbers (excluded)")
-                    
-                    # Step 2: Filter valid mobile numbers only
-                    df1_valid = df1[df1['normalized_mobile'].apply(validate_mobile)].copy()
-                    df2_valid = df2[df2['normalized_mobile'].apply(validate_mobile)].copy()
-                    
-                    # Step 3: Parse dates
-                    df1_valid['parsed_call_date'] = df1_valid[call_date_col].apply(parse_datetime)
-                    df2_valid['parsed_entry_date'] = df2_valid[entry_date_col].apply(parse_datetime)
-                    
-                    # Check for unparseable dates
-                    unparsed_call = df1_valid['parsed_call_date'].isna().sum()
-                    unparsed_entry = df2_valid['parsed_entry_date'].isna().sum()
-                    
-                    if unparsed_call > 0:
-                        warnings.append(f"⚠️ File 1: {unparsed_call} records with unparseable call dates")
-                    if unparsed_entry > 0:
-                        warnings.append(f"⚠️ File 2: {unparsed_entry} records with unparseable entry dates")
-                    
-                    # Step 4: Prepare data for merge
-                    # KEEP ONLY FIRST CALL for each mobile number (remove duplicates)
-                    df1_for_merge = df1_valid[['normalized_mobile', 'parsed_call_date']].copy()
-                    df1_for_merge = df1_for_merge.drop_duplicates(subset='normalized_mobile', keep='first')
-                    df1_for_merge = df1_for_merge.reset_index(drop=True)
-                    
-                    # Count duplicates removed
-                    duplicates_removed = len(df1_valid) - len(df1_for_merge)
-                    if duplicates_removed > 0:
-                        warnings.append(f"ℹ️ File 1: {duplicates_removed} duplicate calls removed (kept first call only)")
-                    
-                    df2_for_merge = df2_valid[['normalized_mobile', ack_col, 'parsed_entry_date']].copy()
-                    df2_for_merge = df2_for_merge.rename(columns={ack_col: 'ack_no'})
-                    # Also remove duplicates from File 2 if any (keep first entry)
-                    df2_duplicates = len(df2_for_merge) - len(df2_for_merge.drop_duplicates(subset='normalized_mobile', keep='first'))
-                    df2_for_merge = df2_for_merge.drop_duplicates(subset='normalized_mobile', keep='first')
-                    df2_for_merge = df2_for_merge.reset_index(drop=True)
-                    
-                    if df2_duplicates > 0:
-                        warnings.append(f"ℹ️ File 2: {df2_duplicates} duplicate entries removed (kept first entry only)")
-                    
-                    # Step 5: Perform INNER JOIN on normalized mobile numbers
-                    merged = pd.merge(
-                        df1_for_merge,
-                        df2_for_merge,
-                        on='normalized_mobile',
-                        how='inner'
-                    )
-                    
-                    # Step 6: Calculate time difference with precision
-                    merged['time_diff'] = merged.apply(
-                        lambda row: calculate_time_difference(row['parsed_entry_date'], row['parsed_call_date']),
-                        axis=1
+                    output_df, warnings, stats = compute_matches(
+                        file1_df, file2_df,
+                        phone_col_file1, call_date_col,
+                        phone_col_file2, entry_date_col, ack_col
                     )
                     
-                    # Step 7: Create final output dataframe
-                    output_df = pd.DataFrame({
-                        'Sr. No.': range(1, len(merged) + 1),
-                        'Acknowledgement No.': merged['ack_no'],
-                        'Mobile Number': merged['normalized_mobile'],
-                        'Call Date': merged['parsed_call_date'].apply(format_datetime_output),
-                        'Entry Date': merged['parsed_entry_date'].apply(format_datetime_output),
-                        'Time Difference': merged['time_diff'].apply(format_time_difference)
-                    })
-                    
-                    # Calculate average time difference
-                    valid_time_diffs = merged['time_diff'].dropna()
-                    if len(valid_time_diffs) > 0:
-                        avg_seconds = valid_time_diffs.apply(lambda x: x.total_seconds()).mean()
-                        avg_timedelta = timedelta(seconds=avg_seconds)
-                        avg_formatted = format_time_difference(avg_timedelta)
-                        
-                        # Add average row at bottom
-                        avg_row = pd.DataFrame({
-                            'Sr. No.': [''],
-                            'Acknowledgement No.': [''],
-                            'Mobile Number': [''],
-                            'Call Date': [''],
-                            'Entry Date': ['AVERAGE'],
-                            'Time Difference': [avg_formatted]
-                        })
-                        output_df = pd.concat([output_df, avg_row], ignore_index=True)
-                    
-                    st.session_state.cnm_matched_df = output_df
+                    # Keep only a Parquet path and a bounded preview in session state
+                    st.session_state.cnm_matched_path = persist_matches(output_df)
+                    st.session_state.cnm_matched_rows = len(output_df)
+                    if len(output_df) > 205:
+                        st.session_state.cnm_matched_preview = pd.concat([output_df.head(200), output_df.tail(5)])
+                    else:
+                        st.session_state.cnm_matched_preview = output_df
+                    st.session_state.cnm_avg_time_diff = stats['avg_time_difference']
                     
                     # Display warnings
                     if warnings:
@@ -389,38 +604,26 @@ def render_call_notice_merge_page():
                     # Display summary statistics
                     st.header("📈 Summary Statistics")
                     
-                    stats_col1, stats_col2, stats_col3, stats_col4 = st.columns(4)
+                    stats_col1, stats_col2, stats_col3, stats_col4, stats_col5 = st.columns(5)
                     
                     with stats_col1:
-                        st.metric("File 1 Total Records", len(st.session_state.cnm_file1_df))
+                        st.metric("File 1 Total Records", st.session_state.cnm_file1_meta['nrows'])
                     with stats_col2:
-                        st.metric("File 2 Total Records", len(st.session_state.cnm_file2_df))
+                        st.metric("File 2 Total Records", st.session_state.cnm_file2_meta['nrows'])
                     with stats_col3:
-                        st.metric("Matched Records", len(output_df) - 1 if len(output_df) > 0 else 0)  # -1 for average row
+                        st.metric("Matched Records", stats['matched_count'])
                     with stats_col4:
-                        # Calculate unique mobiles that didn't match
-                        file1_mobiles = set(df1_valid['normalized_mobile'].dropna())
-                        file2_mobiles = set(df2_valid['normalized_mobile'].dropna())
-                        unmatched_f1 = len(file1_mobiles - file2_mobiles)
-                        unmatched_f2 = len(file2_mobiles - file1_mobiles)
-                        st.metric("Unmatched Unique Mobiles", f"{unmatched_f1} / {unmatched_f2}")
+                        st.metric("Unmatched Unique Mobiles", f"{stats['unmatched_file1']} / {stats['unmatched_file2']}")
+                    with stats_col5:
+                        st.metric("Average Time Difference", stats['avg_time_difference'] or "-")
                     
-                    st.success(f"✅ Successfully matched {len(output_df) - 1} records!")
+                    st.success(f"✅ Successfully matched {stats['matched_count']} records!")
                     
                     # Verification section
                     with st.expander("🔬 Verify Sample Calculations", expanded=True):
                         if len(output_df) > 0:
                             st.write("**First 5 matched records with calculation verification:**")
-                            verify_df = merged.head(5).copy()
-                            verify_df['Call Date Raw'] = verify_df['parsed_call_date']
-                            verify_df['Entry Date Raw'] = verify_df['parsed_entry_date']
-                            verify_df['Time Diff (seconds)'] = verify_df['time_diff'].apply(
-                                lambda x: x.total_seconds() if x is not None and pd.notna(x) else None
-                            )
-                            verify_df['Time Diff Formatted'] = verify_df['time_diff'].apply(format_time_difference)
-                            st.dataframe(verify_df[['normalized_mobile', 'Call Date Raw', 'Entry Date Raw', 
-                                                    'Time Diff (seconds)', 'Time Diff Formatted']], 
-                                        use_container_width=True)
+                            st.dataframe(stats['verify_df'], use_container_width=True)
                     
                 except Exception as e:
                     st.error(f"❌ Error during processing: {str(e)}")
@@ -428,24 +631,29 @@ def render_call_notice_merge_page():
                     st.code(traceback.format_exc())
         
         # Display matched results and download option
-        if st.session_state.cnm_matched_df is not None and len(st.session_state.cnm_matched_df) > 0:
+        matched_path = st.session_state.cnm_matched_path
+        matched_rows = st.session_state.cnm_matched_rows
+        if matched_path is not None and matched_rows > 0 and not Path(matched_path).exists():
+            st.info("ℹ️ Matched results have expired. Click Match Records to run the match again.")
+        elif matched_path is not None and matched_rows > 0:
             st.header("📋 Matched Results Preview")
-            st.dataframe(st.session_state.cnm_matched_df, use_container_width=True)
+            avg_time_diff = st.session_state.cnm_avg_time_diff
+            if avg_time_diff is not None:
+                st.caption(f"Average Time Difference: **{avg_time_diff}**")
+            # Only a slice is shipped to the browser; full data is in the downloads
+            st.dataframe(st.session_state.cnm_matched_preview, use_container_width=True)
+            if matched_rows > 205:
+                st.caption(f"Showing first 200 and last 5 of {matched_rows:,} rows — download for full results.")
             
             # Download buttons
             st.subheader("📥 Download Results")
             download_col1, download_col2 = st.columns(2)
             
+            # Files are built from the Parquet copy only when a download button is clicked
             with download_col1:
-                # Create Excel file for download using openpyxl
-                excel_output = BytesIO()
-                with pd.ExcelWriter(excel_output, engine='openpyxl') as writer:
-                    st.session_state.cnm_matched_df.to_excel(writer, index=False, sheet_name='Matched Records')
-                excel_output.seek(0)
-                
                 st.download_button(
                     label="📥 Download Excel (.xlsx)",
-                    data=excel_output,
+                    data=lambda: generate_excel_from_parquet(matched_path, avg_time_diff),
                     file_name=f"matched_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     type="primary",
@@ -453,18 +661,15 @@ def render_call_notice_merge_page():
                 )
             
             with download_col2:
-                # Create CSV file for download
-                csv_output = st.session_state.cnm_matched_df.to_csv(index=False)
-                
                 st.download_button(
                     label="📥 Download CSV (.csv)",
-                    data=csv_output,
+                    data=lambda: generate_csv_from_parquet(matched_path),
                     file_name=f"matched_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                     mime="text/csv",
                     type="primary",
                     use_container_width=True
                 )
-        elif st.session_state.cnm_matched_df is not None and len(st.session_state.cnm_matched_df) == 0:
+        elif matched_path is not None and matched_rows == 0:
             st.warning("⚠️ No matching records found between the two files.")
     
     # Footer
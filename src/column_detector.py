@@ -6,13 +6,57 @@ to standardized column types.
 """
 
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 
 from src.models import ColumnMapping
 
 
+class _StripTable(dict):
+    """
+    str.translate table for header normalization.
+    
+    Maps the common separators (_ - . /) to spaces, keeps a-z, 0-9 and
+    whitespace, and deletes every other character. Entries are filled in
+    lazily on first sight of a code point so the table stays small.
+    """
+    
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        if char in '_-./':
+            value = ord(' ')
+        elif ('a' <= char <= 'z') or ('0' <= char <= '9') or char.isspace():
+            value = codepoint
+        else:
+            value = None
+        self[codepoint] = value
+        return value
+
+
+# ColumnMapping fields that hold a mapped header name
+_MAPPED_FIELDS: Tuple[str, ...] = (
+    'serial_number', 'acknowledgement_number', 'bank_account_number',
+    'ifsc_code', 'address', 'amount', 'disputed_amount', 'bank_name',
+    'district', 'state'
+)
+
+_STRIP_TABLE = _StripTable()
+_WS_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def _normalize_header_text(header: str) -> str:
+    """Cached normalization of a header string (see ColumnDetector.normalize_header)."""
+    # Lowercase, map separators to spaces and drop special characters in one pass
+    normalized = header.strip().lower().translate(_STRIP_TABLE)
+    
+    # Collapse multiple spaces into single space and final strip
+    return _WS_RE.sub(' ', normalized).strip()
+
+
 class ColumnDetector:
     """
     Detects and maps column headers using fuzzy matching.
@@ -65,6 +109,42 @@ class ColumnDetector:
         ]
     }
     
+    # Flattened view of COLUMN_VARIANTS for batched scoring: parallel lists
+    # of every variant (lowercased once here, not per comparison) and the
+    # column type it belongs to, in declaration order
+    _flat_variants: List[str] = [
+        variant.lower() for variants in COLUMN_VARIANTS.values() for variant in variants
+    ]
+    _flat_types: List[str] = [
+        column_type
+        for column_type, variants in COLUMN_VARIANTS.items()
+        for _ in variants
+    ]
+    _flat_lengths: np.ndarray = np.array(
+        [len(variant) for variant in _flat_variants], dtype=np.int32
+    )
+    
+    # Exact-match lookup: lowercased variant -> column type. Built in reverse
+    # so the first declared type wins if a variant were ever listed twice.
+    _EXACT: Dict[str, str] = dict(zip(reversed(_flat_variants), reversed(_flat_types)))
+    
+    def __init__(self, cache_size: int = 512):
+        """
+        Initialize the ColumnDetector.
+        
+        Args:
+            cache_size: Number of (normalized, original) header lookups to
+                memoize. Fraud sheets reuse the same headers across files, so
+                repeat detections skip fuzzy scoring entirely.
+        """
+        # Per-instance caches; clear with self._find_best_match.cache_clear()
+        # and self._detect_assignments.cache_clear()
+        self._find_best_match = lru_cache(maxsize=cache_size)(self._match_header)
+        self._detect_assignments = lru_cache(maxsize=128)(self._assign_columns)
+        
+        # Header length -> (variant indices, variants) that can reach the threshold
+        self._candidates_by_length: Dict[int, Tuple[np.ndarray, List[str]]] = {}
+    
     def normalize_header(self, header: str) -> str:
         """
         Normalize a header string for comparison.
@@ -82,29 +162,25 @@ class ColumnDetector:
         if not isinstance(header, str):
             header = str(header)
         
-        # Strip leading/trailing whitespace
-        normalized = header.strip()
-        
-        # Convert to lowercase
-        normalized = normalized.lower()
-        
-        # Remove special characters except spaces (keep alphanumeric and spaces)
-        # Replace common separators with spaces first
-        normalized = normalized.replace('_', ' ')
-        normalized = normalized.replace('-', ' ')
-        normalized = normalized.replace('.', ' ')
-        normalized = normalized.replace('/', ' ')
-        
-        # Remove any remaining special characters (keep letters, numbers, spaces)
-        normalized = re.sub(r'[^a-z0-9\s]', '', normalized)
-        
-        # Collapse multiple spaces into single space
-        normalized = re.sub(r'\s+', ' ', normalized)
+        return _normalize_header_text(header)
+    
+    def normalize_headers(self, headers: List[str]) -> List[str]:
+        """
+        Normalize a whole header row at once.
         
-        # Final strip
-        normalized = normalized.strip()
+        Equivalent to calling normalize_header on each header, without the
+        per-header method dispatch; repeated headers hit the shared cache.
         
-        return normalized
+        Args:
+            headers: List of raw header values.
+            
+        Returns:
+            List of normalized header strings, in input order.
+        """
+        return [
+            _normalize_header_text(header if isinstance(header, str) else str(header))
+            for header in headers
+        ]
     
     def calculate_similarity(self, header: str, variant: str) -> float:
         """
@@ -130,14 +206,83 @@ class ColumnDetector:
         # Return the maximum of the three methods for best match
         return max(ratio, token_sort, partial)
     
-    def _find_best_match(
+    def _length_candidates(self, header_length: int) -> Tuple[np.ndarray, List[str]]:
+        """
+        Return the variants a header of this length can possibly match.
+        
+        ratio and token_sort_ratio are both bounded by 2*min(len)/(len_a + len_b),
+        so a variant can only reach the threshold t when
+        (2 - t) * shorter >= t * longer. Results are memoized per length.
+        
+        Args:
+            header_length: Length of the normalized header.
+            
+        Returns:
+            Tuple of (indices into _flat_variants, the variants themselves),
+            both in declaration order.
+        """
+        cached = self._candidates_by_length.get(header_length)
+        if cached is not None:
+            return cached
+        
+        threshold = self.SIMILARITY_THRESHOLD
+        shorter = np.minimum(self._flat_lengths, header_length)
+        longer = np.maximum(self._flat_lengths, header_length)
+        # Small tolerance keeps the bound lossless under float rounding
+        indices = np.flatnonzero((2 - threshold) * shorter >= threshold * longer - 1e-9)
+        
+        cached = (indices, [self._flat_variants[idx] for idx in indices])
+        self._candidates_by_length[header_length] = cached
+        return cached
+    
+    def _score_matrix(
+        self,
+        normalized_headers: List[str],
+        variants: Optional[List[str]] = None,
+        score_cutoff: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Score every normalized header against every known variant in one batch.
+        
+        Uses rapidfuzz.process.cdist so the header x variant comparisons run
+        inside the C++ extension instead of one Python call per pair.
+        
+        Args:
+            normalized_headers: List of normalized header strings.
+            variants: Variants to score against (defaults to all _flat_variants).
+            score_cutoff: Optional 0-100 cutoff; pairs scoring below it are
+                reported as 0 and let the C++ kernel exit early.
+            
+        Returns:
+            Array of shape (len(normalized_headers), len(variants)) holding
+            max(ratio, token_sort_ratio) scaled to 0.0-1.0.
+        """
+        if variants is None:
+            variants = self._flat_variants
+        
+        ratio = process.cdist(
+            normalized_headers, variants,
+            scorer=fuzz.ratio, dtype=np.float64, workers=-1,
+            score_cutoff=score_cutoff
+        )
+        token_sort = process.cdist(
+            normalized_headers, variants,
+            scorer=fuzz.token_sort_ratio, dtype=np.float64, workers=-1,
+            score_cutoff=score_cutoff
+        )
+        return np.maximum(ratio, token_sort) / 100.0
+    
+    def _match_header(
         self, 
         normalized_header: str,
         original_header: str = ""
-    ) -> Tuple[Optional[str], float, List[Tuple[str, float]]]:
+    ) -> Tuple[Optional[str], float, Tuple[Tuple[str, float], ...]]:
         """
         Find the best matching column type for a normalized header.
         
+        Uncached implementation behind self._find_best_match; all_matches is
+        returned as a tuple so cached results cannot be mutated by callers.
+        
         Args:
             normalized_header: The normalized header string.
             original_header: The original header string (for exact matching).
@@ -145,47 +290,38 @@ class ColumnDetector:
         Returns:
             Tuple of (best_column_type, confidence_score, all_matches_above_threshold)
         """
-        best_match: Optional[str] = None
-        best_score: float = 0.0
-        all_matches: List[Tuple[str, float]] = []
-        
         # Also normalize the original header for comparison (lowercase, strip)
         original_lower = original_header.lower().strip() if original_header else ""
         
-        # First pass: look for exact matches (highest priority)
-        for column_type, variants in self.COLUMN_VARIANTS.items():
-            for variant in variants:
-                # Check for exact match with original header (case-insensitive)
-                if original_lower == variant.lower():
-                    # Exact match - 100% confidence
-                    all_matches.append((column_type, 1.0))
-                    if 1.0 > best_score:
-                        best_score = 1.0
-                        best_match = column_type
-        
-        # If we found an exact match, return it immediately
-        if best_score == 1.0:
-            return best_match, best_score, all_matches
-        
-        # Second pass: fuzzy matching (only if no exact match found)
-        for column_type, variants in self.COLUMN_VARIANTS.items():
-            for variant in variants:
-                # Use ratio (not partial_ratio) to avoid substring matching issues
-                ratio = fuzz.ratio(normalized_header, variant) / 100.0
-                token_sort = fuzz.token_sort_ratio(normalized_header, variant) / 100.0
-                
-                # Take the max of ratio and token_sort, but NOT partial_ratio
-                # to avoid 'disputed amount' matching 'amount'
-                score = max(ratio, token_sort)
-                
-                if score >= self.SIMILARITY_THRESHOLD:
-                    all_matches.append((column_type, score))
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_match = column_type
-        
-        return best_match, best_score, all_matches
+        # First pass: exact match (highest priority) - a single dict probe
+        exact_type = self._EXACT.get(original_lower)
+        if exact_type is not None:
+            return exact_type, 1.0, ((exact_type, 1.0),)
+        
+        # Second pass: fuzzy matching (only if no exact match found),
+        # restricted to variants whose length can still reach the threshold
+        candidates, candidate_variants = self._length_candidates(len(normalized_header))
+        if candidates.size == 0:
+            return None, 0.0, ()
+        
+        # Scores are max(ratio, token_sort) but NOT partial_ratio
+        # to avoid 'disputed amount' matching 'amount'
+        scores = self._score_matrix(
+            [normalized_header], candidate_variants,
+            score_cutoff=self.SIMILARITY_THRESHOLD * 100 - 1e-6
+        )[0]
+        
+        above = np.flatnonzero(scores >= self.SIMILARITY_THRESHOLD)
+        if above.size == 0:
+            return None, 0.0, ()
+        
+        all_matches = tuple(
+            (self._flat_types[candidates[idx]], float(scores[idx])) for idx in above
+        )
+        
+        # argmax returns the first maximum; candidates keep declaration order
+        best_idx = int(np.argmax(scores))
+        return self._flat_types[candidates[best_idx]], float(scores[best_idx]), all_matches
     
     def detect_columns(self, headers: List[str]) -> ColumnMapping:
         """
@@ -203,47 +339,71 @@ class ColumnDetector:
             
         Requirements: 2.1, 2.2, 2.3, 2.4
         """
-        mapping = ColumnMapping()
+        assigned_types, confidence_scores, ambiguous_mappings = (
+            self._detect_assignments(tuple(headers))
+        )
+        
+        # Build a fresh mapping (and fresh dicts/lists) per call so callers
+        # can edit the result without touching the cached assignment
+        return ColumnMapping(
+            **dict(assigned_types),
+            confidence_scores=dict(confidence_scores),
+            ambiguous_mappings={
+                header: list(types) for header, types in ambiguous_mappings
+            }
+        )
+    
+    def _assign_columns(self, headers: Tuple[str, ...]) -> Tuple[
+        Tuple[Tuple[str, str], ...],
+        Tuple[Tuple[str, float], ...],
+        Tuple[Tuple[str, Tuple[str, ...]], ...]
+    ]:
+        """
+        Assign headers to column types.
+        
+        Uncached implementation behind self._detect_assignments, which is keyed
+        on the whole header row since many files share identical headers.
+        Results are returned as tuples so the cached value is immutable.
+        
+        Args:
+            headers: Tuple of column header strings from the input file.
+            
+        Returns:
+            Tuple of (column_type -> header pairs, column_type -> confidence
+            pairs, header -> ambiguous column types pairs).
+        """
         confidence_scores: Dict[str, float] = {}
-        ambiguous_mappings: Dict[str, List[str]] = {}
+        ambiguous_mappings: Dict[str, Tuple[str, ...]] = {}
         
         # Track which column types have been assigned
         assigned_types: Dict[str, str] = {}  # column_type -> original_header
         
-        for header in headers:
-            normalized = self.normalize_header(header)
+        # Normalize the whole header row up front in one batch
+        normalized_headers = self.normalize_headers(headers)
+        
+        for header, normalized in zip(headers, normalized_headers):
             best_match, best_score, all_matches = self._find_best_match(normalized, header)
             
             if best_match is None:
                 continue
             
             # Check for ambiguous mappings (multiple column types match)
-            unique_types = list(set(match[0] for match in all_matches))
+            unique_types = tuple(set(match[0] for match in all_matches))
             if len(unique_types) > 1:
                 # Multiple potential matches - flag for user confirmation
                 ambiguous_mappings[header] = unique_types
             
-            # Check if this column type is already assigned
-            if best_match in assigned_types:
-                # Compare scores and keep the better match
-                existing_header = assigned_types[best_match]
-                existing_score = confidence_scores.get(best_match, 0.0)
-                
-                if best_score > existing_score:
-                    # New header is a better match
-                    assigned_types[best_match] = header
-                    confidence_scores[best_match] = best_score
-                    setattr(mapping, best_match, header)
-            else:
-                # First match for this column type
+            # Keep the first match for each column type unless a later
+            # header scores strictly better
+            if best_score > confidence_scores.get(best_match, 0.0) or best_match not in assigned_types:
                 assigned_types[best_match] = header
                 confidence_scores[best_match] = best_score
-                setattr(mapping, best_match, header)
-        
-        mapping.confidence_scores = confidence_scores
-        mapping.ambiguous_mappings = ambiguous_mappings
         
-        return mapping
+        return (
+            tuple(assigned_types.items()),
+            tuple(confidence_scores.items()),
+            tuple(ambiguous_mappings.items())
+        )
     
     def get_unmapped_headers(
         self, 
@@ -260,16 +420,8 @@ class ColumnDetector:
         Returns:
             List of headers that were not mapped.
         """
-        mapped_headers = set()
-        
-        for field in [
-            'serial_number', 'acknowledgement_number', 'bank_account_number',
-            'ifsc_code', 'address', 'amount', 'disputed_amount', 'bank_name',
-            'district', 'state'
-        ]:
-            value = getattr(mapping, field)
-            if value is not None:
-                mapped_headers.add(value)
+        mapped_headers = {getattr(mapping, field) for field in _MAPPED_FIELDS}
+        mapped_headers.discard(None)
         
         return [h for h in headers if h not in mapped_headers]
     
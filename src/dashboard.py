@@ -5,15 +5,153 @@ Provides statistics calculation, search, and filtering capabilities
 for aggregated fraud transaction data.
 """
 
+from dataclasses import dataclass
 from typing import List, Optional
 from datetime import datetime
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
 from src.models import AggregatedAccount, ProcessingStats
 
 
+def _top_n_indices(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Return indices of the n largest values, largest first.
+    
+    Uses argpartition (O(N)) instead of a full sort. Ties are resolved by
+    original position, matching a stable descending sort.
+    """
+    if len(values) <= n:
+        return np.argsort(-values, kind='stable')
+    
+    # n-th largest value; everything above it is in, ties fill the remainder
+    threshold = values[np.argpartition(-values, n - 1)[n - 1]]
+    above = np.flatnonzero(values > threshold)
+    ties = np.flatnonzero(values == threshold)[:n - len(above)]
+    selected = np.concatenate([above, ties])
+    
+    # Lexsort by (-value, position) keeps the stable-sort order
+    return selected[np.lexsort((selected, -values[selected]))]
+
+
+@dataclass(frozen=True)
+class AccountColumns:
+    """
+    Column (structure-of-arrays) view of a list of AggregatedAccount.
+    
+    Each field holds one attribute for every account, in list order, so
+    filters and statistics run as vectorized array operations. The
+    original list is kept only to hand accounts back by index.
+    """
+    accounts: List[AggregatedAccount]
+    account_numbers: pa.Array
+    total_amounts: np.ndarray
+    total_disputed_amounts: np.ndarray
+    total_transactions: np.ndarray
+    
+    @classmethod
+    def from_accounts(cls, accounts: List[AggregatedAccount]) -> 'AccountColumns':
+        """Extract the column arrays from a list of accounts in one pass each."""
+        count = len(accounts)
+        return cls(
+            accounts=accounts,
+            account_numbers=pa.array(
+                [acc.account_number for acc in accounts], type=pa.string()
+            ),
+            total_amounts=np.fromiter(
+                (acc.total_amount for acc in accounts), dtype=np.float64, count=count
+            ),
+            total_disputed_amounts=np.fromiter(
+                (acc.total_disputed_amount for acc in accounts), dtype=np.float64, count=count
+            ),
+            total_transactions=np.fromiter(
+                (acc.total_transactions for acc in accounts), dtype=np.int64, count=count
+            ),
+        )
+    
+    def select(self, mask: np.ndarray) -> List[AggregatedAccount]:
+        """Return the accounts where mask is True, in list order."""
+        return [self.accounts[i] for i in np.flatnonzero(mask)]
+
+
 class Dashboard:
     """Dashboard for viewing and filtering fraud analysis results."""
     
+    def __init__(self):
+        """Initialize the Dashboard."""
+        # Columns for the most recent account list. The app keeps one
+        # Dashboard per session, so sessions never share or evict this view
+        self._columns: Optional[AccountColumns] = None
+    
+    def set_accounts(self, accounts: List[AggregatedAccount]) -> AccountColumns:
+        """
+        Build and cache the column view used by statistics and filters.
+        
+        The view is reused for as long as the same accounts list object is
+        passed in.
+        
+        Args:
+            accounts: List of aggregated account data.
+            
+        Returns:
+            AccountColumns for the accounts.
+        """
+        columns = AccountColumns.from_accounts(accounts)
+        self._columns = columns
+        return columns
+    
+    def _columns_for(self, accounts: List[AggregatedAccount]) -> AccountColumns:
+        """Return the cached column view for accounts, building it if needed."""
+        columns = self._columns
+        if columns is not None and columns.accounts is accounts:
+            return columns
+        return self.set_accounts(accounts)
+    
+    def filter_accounts(
+        self,
+        accounts: List[AggregatedAccount],
+        query: str = "",
+        min_transactions: int = 0,
+        min_amount: float = 0.0
+    ) -> List[AggregatedAccount]:
+        """
+        Apply search and minimum filters in a single vectorized pass.
+        
+        Each active criterion becomes a boolean mask over the cached column
+        view and the masks are combined with &, so chained filters cost one
+        pass instead of one list comprehension each.
+        
+        Args:
+            accounts: List of aggregated accounts to filter.
+            query: Search query to match against account numbers (substring).
+            min_transactions: Minimum number of transactions required.
+            min_amount: Minimum total amount required.
+            
+        Returns:
+            List of accounts matching every active criterion, in input order.
+        """
+        query = query.strip() if query else ""
+        
+        if not query and min_transactions <= 0 and min_amount <= 0:
+            return accounts
+        
+        columns = self._columns_for(accounts)
+        mask = np.ones(len(accounts), dtype=bool)
+        
+        if query:
+            matches = pc.match_substring(columns.account_numbers, query).fill_null(False)
+            mask &= matches.to_numpy(zero_copy_only=False)
+        
+        if min_transactions > 0:
+            mask &= columns.total_transactions >= min_transactions
+        
+        if min_amount > 0:
+            mask &= columns.total_amounts >= min_amount
+        
+        return columns.select(mask)
+    
     def calculate_statistics(
         self, 
         accounts: List[AggregatedAccount],
@@ -47,17 +185,22 @@ class Dashboard:
                 input_filename=input_filename
             )
         
-        # Calculate totals
-        total_fraud_amount = sum(acc.total_amount for acc in accounts)
-        total_disputed_amount = sum(acc.total_disputed_amount for acc in accounts)
         unique_accounts = len(accounts)
         
+        # Reduce the cached amount columns in NumPy
+        columns = self._columns_for(accounts)
+        amounts = columns.total_amounts
+        disputed = columns.total_disputed_amounts
+        
+        # Calculate totals
+        total_fraud_amount = float(amounts.sum())
+        total_disputed_amount = float(disputed.sum())
+        
         # Calculate average
         average_amount = total_fraud_amount / unique_accounts if unique_accounts > 0 else 0.0
         
         # Get top 10 accounts by amount
-        sorted_accounts = sorted(accounts, key=lambda x: -x.total_amount)
-        top_accounts = sorted_accounts[:10]
+        top_accounts = [accounts[i] for i in _top_n_indices(amounts, 10)]
         
         return ProcessingStats(
             total_input_rows=total_input_rows,
@@ -87,15 +230,7 @@ class Dashboard:
         Returns:
             List of accounts where account number contains the query.
         """
-        if not query or not query.strip():
-            return accounts
-        
-        query = query.strip()
-        
-        return [
-            acc for acc in accounts 
-            if query in acc.account_number
-        ]
+        return self.filter_accounts(accounts, query=query)
     
     def filter_by_min_transactions(
         self, 
@@ -112,13 +247,7 @@ class Dashboard:
         Returns:
             List of accounts with transaction count >= min_transactions.
         """
-        if min_transactions <= 0:
-            return accounts
-        
-        return [
-            acc for acc in accounts 
-            if acc.total_transactions >= min_transactions
-        ]
+        return self.filter_accounts(accounts, min_transactions=min_transactions)
     
     def filter_by_min_amount(
         self, 
@@ -135,13 +264,7 @@ class Dashboard:
         Returns:
             List of accounts with total_amount >= min_amount.
         """
-        if min_amount <= 0:
-            return accounts
-        
-        return [
-            acc for acc in accounts 
-            if acc.total_amount >= min_amount
-        ]
+        return self.filter_accounts(accounts, min_amount=min_amount)
     
     def get_flagged_rows(
         self, 
@@ -158,8 +281,11 @@ class Dashboard:
         Returns:
             List of accounts that match the flagged account numbers.
         """
-        flagged_set = set(flagged_account_numbers)
-        return [
-            acc for acc in accounts 
-            if acc.account_number in flagged_set
-        ]
+        if not flagged_account_numbers or not accounts:
+            return []
+        
+        # Hashed membership over the cached account-number column in one pass
+        columns = self._columns_for(accounts)
+        flagged = pa.array(list(set(flagged_account_numbers)), type=pa.string())
+        mask = pc.is_in(columns.account_numbers, value_set=flagged).fill_null(False)
+        return columns.select(mask.to_numpy(zero_copy_only=False))
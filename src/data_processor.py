@@ -2,11 +2,67 @@
 Data Processor - FAST but with ALL features preserved.
 """
 
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
-from typing import Optional
+from typing import Callable, Optional
 from src.models import ColumnMapping
 
+# Upper bound on threads used for per-column string cleaning
+MAX_CLEAN_WORKERS = 8
+
+
+def _clean_string_column(series: pd.Series) -> pd.Series:
+    """Arrow-backed strip plus 'nan'/'None'/'' -> NA for one column."""
+    # Arrow-backed strings: one contiguous buffer per column and the .str
+    # methods run as Arrow compute kernels (which release the GIL)
+    result = series.astype('string[pyarrow]').str.strip()
+    return result.replace(['nan', 'None', ''], pd.NA)
+
+
+def _trim_string_column(series: pd.Series) -> pd.Series:
+    """Strip whitespace from one column and turn 'nan' back into NA."""
+    return series.astype(str).str.strip().replace('nan', pd.NA)
+
+
+@lru_cache(maxsize=4096)
+def _parse_amount_text(amount_str: str) -> float:
+    """Cached text path of DataProcessor.parse_amount; amount strings repeat heavily."""
+    amount_str = amount_str.strip()
+    if not amount_str:
+        return 0.0
+    
+    cleaned = DataProcessor._CURRENCY_RE.sub('', amount_str).strip()
+    
+    try:
+        return float(cleaned)
+    except ValueError:
+        return 0.0
+
+
+def _apply_to_columns(
+    df: pd.DataFrame,
+    columns: pd.Index,
+    func: Callable[[pd.Series], pd.Series]
+) -> None:
+    """
+    Replace each of columns in df with func(column), in place.
+    
+    Columns are independent, so with more than one they are processed on a
+    thread pool; results are assigned back on the calling thread.
+    """
+    if len(columns) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_CLEAN_WORKERS, len(columns))) as executor:
+            results = list(executor.map(func, (df[col] for col in columns)))
+    else:
+        results = [func(df[col]) for col in columns]
+    
+    for col, result in zip(columns, results):
+        df[col] = result
+
 
 class DataProcessor:
     """
@@ -16,26 +72,30 @@ class DataProcessor:
     
     CURRENCY_SYMBOLS = ['₹', '$', '£', '€', 'Rs.', 'Rs', 'INR', 'USD']
     
+    # Every currency symbol plus the thousands separator in one alternation,
+    # so amounts are stripped in a single pass instead of one per symbol
+    _CURRENCY_RE = re.compile('|'.join(map(re.escape, CURRENCY_SYMBOLS)) + '|,')
+    
     def clean_dataframe(self, df: pd.DataFrame, mapping: ColumnMapping) -> pd.DataFrame:
         """
         Apply all cleaning operations - FAST but complete.
         """
-        df = df.copy()
+        # Shallow copy: every step below replaces whole columns, never
+        # writes into the caller's arrays, so a deep copy is wasted traffic
+        df = df.copy(deep=False)
         
-        # Step 1: Remove empty rows
-        df = df.dropna(how='all').reset_index(drop=True)
+        # Step 1: Remove empty rows (null or blank in every column)
+        df = self.remove_empty_rows(df)
         
-        # Step 2: Trim whitespace from string columns
-        str_cols = df.select_dtypes(include=['object']).columns
-        for col in str_cols:
-            df[col] = df[col].astype(str).str.strip()
-            df[col] = df[col].replace(['nan', 'None', ''], pd.NA)
+        # Step 2: Trim whitespace from string columns (columns cleaned in parallel)
+        str_cols = df.select_dtypes(include=['object', 'string']).columns
+        _apply_to_columns(df, str_cols, _clean_string_column)
         
         # Step 3: Standardize account numbers
         if mapping.bank_account_number and mapping.bank_account_number in df.columns:
             df[mapping.bank_account_number] = (
                 df[mapping.bank_account_number]
-                .astype(str)
+                .astype('string[pyarrow]')
                 .str.replace(r'[\s\-]', '', regex=True)
                 .replace(['nan', 'None', ''], pd.NA)
             )
@@ -51,29 +111,54 @@ class DataProcessor:
     
     def _parse_amounts_fast(self, series: pd.Series) -> pd.Series:
         """Parse amounts - vectorized and fast."""
-        result = series.astype(str).str.strip()
+        # Already numeric (e.g. inferred by the reader): nothing to strip
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return series.astype(np.float64).fillna(0.0)
+        
+        # Amount columns repeat the same strings heavily: parse each distinct
+        # value once and broadcast back through the factorize codes
+        codes, uniques = pd.factorize(series.astype('string[pyarrow]'))
+        uniques = pd.Series(uniques, dtype='string[pyarrow]')
+        
+        # Most values are usually plain numbers; parse those directly and only
+        # send the ones that failed through the string-cleaning pipeline
+        parsed = pd.to_numeric(uniques, errors='coerce').astype(np.float64)
+        needs_cleaning = parsed.isna().to_numpy(dtype=bool)
+        if needs_cleaning.any():
+            parsed[needs_cleaning] = self._strip_currency(uniques[needs_cleaning]).to_numpy()
         
-        # Remove currency symbols
-        for symbol in self.CURRENCY_SYMBOLS:
-            result = result.str.replace(symbol, '', regex=False)
+        values = parsed.fillna(0.0).to_numpy()
+        result = np.where(codes >= 0, values[codes] if len(values) else 0.0, 0.0)
+        return pd.Series(result, index=series.index, name=series.name)
+    
+    def _strip_currency(self, series: pd.Series) -> pd.Series:
+        """Strip currency symbols/commas from amount strings and convert to float."""
+        # Arrow-backed strings send the regex replace to Arrow's RE2 kernel:
+        # one linear automaton pass per cell for all symbols and commas
+        result = series.astype('string[pyarrow]').str.strip()
         
-        # Remove commas
-        result = result.str.replace(',', '', regex=False)
+        # The pattern string (not the compiled object) keeps it on that path
+        result = result.str.replace(self._CURRENCY_RE.pattern, '', regex=True)
         result = result.str.strip()
         
         # Convert to numeric
-        return pd.to_numeric(result, errors='coerce').fillna(0.0)
+        return pd.to_numeric(result, errors='coerce').astype(np.float64)
     
     # Keep these for compatibility
     def remove_empty_rows(self, df: pd.DataFrame) -> pd.DataFrame:
-        return df.dropna(how='all').reset_index(drop=True)
+        # A cell is empty if it is null or, in string columns, blank after
+        # stripping; one typed strip/eq per string column, no regex pass
+        empty = df.isna()
+        str_cols = df.select_dtypes(include=['object', 'string']).columns
+        for col in str_cols:
+            blank = df[col].astype('string[pyarrow]').str.strip().eq('')
+            empty[col] |= blank.fillna(False).to_numpy(dtype=bool)
+        return df[~empty.all(axis=1).to_numpy(dtype=bool)].reset_index(drop=True)
     
     def trim_whitespace(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
+        df = df.copy(deep=False)
         str_cols = df.select_dtypes(include=['object']).columns
-        for col in str_cols:
-            df[col] = df[col].astype(str).str.strip()
-            df[col] = df[col].replace('nan', pd.NA)
+        _apply_to_columns(df, str_cols, _trim_string_column)
         return df
     
     def standardize_account_numbers_vectorized(self, series: pd.Series) -> pd.Series:
@@ -95,17 +180,11 @@ class DataProcessor:
         if amount_str is None or amount_str == 'nan' or amount_str == 'None' or amount_str == '':
             return 0.0
         
-        amount_str = str(amount_str).strip()
-        if not amount_str:
-            return 0.0
+        # Numbers need no text cleaning (bool is excluded: str(True) parses to 0.0)
+        if isinstance(amount_str, (int, float)) and not isinstance(amount_str, bool):
+            try:
+                return float(amount_str)
+            except OverflowError:
+                pass
         
-        cleaned = amount_str
-        for symbol in self.CURRENCY_SYMBOLS:
-            cleaned = cleaned.replace(symbol, '')
-        
-        cleaned = cleaned.replace(',', '').strip()
-        
-        try:
-            return float(cleaned)
-        except (ValueError, TypeError):
-            return 0.0
+        return _parse_amount_text(str(amount_str))
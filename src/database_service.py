@@ -5,11 +5,123 @@ GUJARAT CYBER POLICE - DATA INTEGRITY GUARANTEED
 """
 
 import mysql.connector
-from mysql.connector import Error
-from typing import List, Optional, Dict, Any, Generator
+from mysql.connector import Error, pooling
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Generator, Iterable, Iterator
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 import pandas as pd
+import numpy as np
 import hashlib
+import itertools
+import os
+import tempfile
+import threading
+import warnings
+
+
+# The dataset checksum is an integrity check, not a security boundary.
+# OpenSSL-backed hashlib picks SHA-NI / ARMv8 SHA instructions when the CPU
+# has them; the built-in fallback is several times slower on large saves.
+if type(hashlib.new('sha256', usedforsecurity=False)).__module__ != '_hashlib':
+    warnings.warn(
+        "hashlib is not backed by OpenSSL; dataset checksums will use the "
+        "slower built-in SHA256",
+        RuntimeWarning
+    )
+
+# Connection pools shared by every DatabaseService with the same settings;
+# the app builds a new service per page run, so pools must outlive instances
+_POOLS: Dict[tuple, pooling.MySQLConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+# Columns load_dataset_filtered may sort by (interpolated into ORDER BY)
+_VALID_SORT_COLUMNS = frozenset({
+    'account_number', 'bank_name', 'district', 'state',
+    'total_amount', 'total_transactions', 'ack_count', 'risk_score'
+})
+
+# load_dataset_filtered conditions, in argument order: (clause, is_text).
+# Text filters match substrings when non-empty; numeric ones apply when > 0.
+_FILTER_CLAUSES = (
+    ("account_number LIKE %s", True),
+    ("bank_name LIKE %s", True),
+    ("district LIKE %s", True),
+    ("state LIKE %s", True),
+    ("total_amount >= %s", False),
+    ("total_amount <= %s", False),
+    ("total_transactions >= %s", False),
+    ("ack_count >= %s", False),
+)
+
+
+@lru_cache(maxsize=64)
+def _multi_insert_sql(row_count: int) -> str:
+    """INSERT text for row_count rows; cached so equal counts share one string."""
+    return (DatabaseService.INSERT_ACCOUNTS_SQL
+            + ",".join([DatabaseService.ROW_PLACEHOLDER] * row_count))
+
+
+# Scale of the DECIMAL amount and risk score columns
+_DECIMAL_PLACES = Decimal('0.01')
+
+
+def _decimal_text(value: float) -> str:
+    """
+    Amount text for a DECIMAL(.., 2) column in a LOAD DATA file.
+    
+    Rounds the shortest repr half away from zero, the same value the
+    server stores for a bound float, so loads carry no rounding notes.
+    """
+    return str(Decimal(repr(value)).quantize(_DECIMAL_PLACES, rounding=ROUND_HALF_UP))
+
+
+class _AccountRows:
+    """
+    Single pass over the accounts of a dataset being saved.
+    
+    Iterating yields the aggregated_accounts row tuple for each account and,
+    in the same loop, feeds the SHA256 dataset checksum and accumulates the
+    total amount. Both are complete once every row has been consumed.
+    """
+    
+    def __init__(self, accounts: List[Any], dataset_id: int, ack_counts: List[int]):
+        self.total_amount = 0
+        self._checksum = hashlib.new('sha256', usedforsecurity=False)
+        self._rows = self._generate(accounts, dataset_id, ack_counts)
+    
+    def __iter__(self) -> Iterator[tuple]:
+        return self._rows
+    
+    @property
+    def checksum(self) -> bytes:
+        """32-byte digest over account_number|total_amount|total_transactions|."""
+        return self._checksum.digest()
+    
+    def _generate(self, accounts: List[Any], dataset_id: int,
+                  ack_counts: List[int]) -> Iterator[tuple]:
+        update_checksum = self._checksum.update
+        for acc, ack_count in zip(accounts, ack_counts):
+            update_checksum(
+                f"{acc.account_number}|{acc.total_amount}|{acc.total_transactions}|".encode()
+            )
+            self.total_amount += acc.total_amount
+            yield (
+                dataset_id,
+                str(acc.account_number) if acc.account_number else '',
+                str(acc.acknowledgement_numbers) if acc.acknowledgement_numbers else '',
+                ack_count,
+                str(acc.bank_name) if acc.bank_name else '',
+                str(acc.ifsc_code) if acc.ifsc_code else '',
+                str(acc.address) if acc.address else '',
+                str(acc.district) if acc.district else '',
+                str(acc.state) if acc.state else '',
+                int(acc.total_transactions) if acc.total_transactions else 0,
+                float(acc.total_amount) if acc.total_amount else 0,
+                float(acc.total_disputed_amount) if acc.total_disputed_amount else 0,
+                float(acc.risk_score) if acc.risk_score else 0
+            )
 
 
 class DatabaseService:
@@ -17,6 +129,79 @@ class DatabaseService:
     
     BATCH_SIZE = 10000
     
+    # Connections per pool (Connector/Python allows at most 32)
+    POOL_SIZE = 25
+    
+    # One dataset ingest at a time per process: concurrent saves contend on
+    # the same index pages, and serializing them leaves the pool to readers
+    _WRITE_LOCK = threading.Lock()
+    
+    INSERT_ACCOUNTS_SQL = """
+        INSERT INTO aggregated_accounts 
+        (dataset_id, account_number, acknowledgement_numbers, ack_count,
+         bank_name, ifsc_code, address, district, state,
+         total_transactions, total_amount, total_disputed_amount, risk_score)
+        VALUES """
+    ROW_PLACEHOLDER = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+    
+    # Per-dataset composite indexes: every read filters on dataset_id, so
+    # leading with it turns filters and ORDER BY total_amount ... LIMIT into
+    # range scans of one dataset instead of a filesort over its rows
+    ACCOUNT_INDEXES = {
+        'idx_ds_amount': '(dataset_id, total_amount DESC)',
+        'idx_ds_district': '(dataset_id, district)',
+        'idx_ds_account': '(dataset_id, account_number)',
+        'idx_ds_bank': '(dataset_id, bank_name(64))',
+    }
+    
+    # Rows pulled per fetchmany() when reading datasets back
+    FETCH_SIZE = 50000
+    
+    LOAD_SELECT_SQL = """
+        SELECT 
+            account_number AS `Fraudster Bank Account Number`,
+            acknowledgement_numbers AS `All Acknowledgement Numbers`,
+            ack_count AS `ACK Count`,
+            bank_name AS `Bank Name`,
+            ifsc_code AS `IFSC Code`,
+            address AS `Address`,
+            district AS `District`,
+            state AS `State`,
+            total_transactions AS `Total Transactions`,
+            total_amount AS `Total Amount`,
+            total_disputed_amount AS `Total Disputed Amount`,
+            risk_score AS `Risk Score`
+        FROM aggregated_accounts
+        WHERE dataset_id = %s
+    """
+    
+    # Rows per prepared multi-row INSERT: 13 placeholders each stays well
+    # under MySQL's 65535 parameter limit, and full statements reuse one plan
+    ROWS_PER_STATEMENT = 1000
+    
+    # Upper bound on the SQL bytes one row adds beyond its text (numbers,
+    # quotes, commas); text is counted at 4 bytes/char (UTF-8 or escaped)
+    ROW_OVERHEAD_BYTES = 256
+    
+    LOAD_ACCOUNTS_SQL = """
+        LOAD DATA LOCAL INFILE %s INTO TABLE aggregated_accounts
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+        (dataset_id, account_number, acknowledgement_numbers, ack_count,
+         bank_name, ifsc_code, address, district, state,
+         total_transactions, total_amount, total_disputed_amount, risk_score)
+    """
+    
+    # One match per ACK token that has a non-whitespace character: tokens are
+    # split on ',' or ';' and the whitespace class mirrors str.isspace()
+    _ACK_TOKEN_PATTERN = r'[^,;\s\pZ\x0b\x1c-\x1f\x85][^,;]*'
+    
+    # Characters LOAD DATA would otherwise read as field/line structure
+    _INFILE_ESCAPES = str.maketrans({
+        '\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'
+    })
+    
     def __init__(self, host: str = "localhost", port: int = 3306, 
                  user: str = "root", password: str = "", database: str = "gujarat_cyber_police"):
         self.host = host
@@ -24,42 +209,98 @@ class DatabaseService:
         self.user = user
         self.password = password
         self.database = database
-        self.connection = None
+        self._pool = None
         self.last_error = ""
+        self._max_packet = None
+        self._local_infile = None
     
     def connect(self) -> bool:
-        """Establish secure connection to MySQL server."""
+        """
+        Attach to the shared connection pool for these settings.
+        
+        The first service for a given host/user/database creates the
+        database and tables and opens the pool; later ones reuse it.
+        """
+        key = (self.host, self.port, self.user, self.password, self.database)
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                autocommit=False
-            )
-            
-            if self.connection.is_connected():
-                cursor = self.connection.cursor()
-                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
-                cursor.execute(f"USE {self.database}")
-                cursor.close()
-                self._create_tables()
-                return True
-                
+            with _POOLS_LOCK:
+                pool = _POOLS.get(key)
+                if pool is None:
+                    pool = self._create_pool(len(_POOLS))
+                    _POOLS[key] = pool
+            self._pool = pool
+            return True
         except Error as e:
             self.last_error = str(e)
             return False
+    
+    def _create_pool(self, pool_number: int) -> pooling.MySQLConnectionPool:
+        """Create the database and tables, then open a pool bound to it."""
+        connection = mysql.connector.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            autocommit=False
+        )
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+            cursor.execute(f"USE {self.database}")
+            cursor.close()
+            self._create_tables(connection)
+        finally:
+            connection.close()
         
-        return False
+        return pooling.MySQLConnectionPool(
+            pool_name=f"gcp_{pool_number}",
+            pool_size=self.POOL_SIZE,
+            pool_reset_session=True,
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            autocommit=False
+        )
+    
+    def _bulk_load_connection(self):
+        """
+        Open a dedicated connection for saving a dataset.
+        
+        Only this connection may send LOAD DATA LOCAL INFILE files; pooled
+        connections, which serve every read, keep local infile disabled.
+        """
+        return mysql.connector.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            autocommit=False,
+            allow_local_infile=True
+        )
+    
+    def _ensure_pool(self) -> bool:
+        """Connect to the pool if this service has not done so yet."""
+        return self._pool is not None or self.connect()
+    
+    @contextmanager
+    def _conn(self):
+        """Borrow a pooled connection; closing returns it (session reset) to the pool."""
+        connection = self._pool.get_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
     
     def disconnect(self):
-        """Close database connection safely."""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Release this service's pool; pooled connections stay open for reuse."""
+        self._pool = None
 
-    def _create_tables(self):
+    def _create_tables(self, connection):
         """Create tables with proper constraints for data integrity."""
-        cursor = self.connection.cursor()
+        cursor = connection.cursor()
         
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS datasets (
@@ -68,7 +309,7 @@ class DatabaseService:
                 description TEXT,
                 total_accounts INT NOT NULL,
                 total_amount DECIMAL(20, 2) NOT NULL,
-                data_checksum VARCHAR(64),
+                data_checksum BINARY(32),
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 source_filename VARCHAR(255),
                 verified BOOLEAN DEFAULT FALSE,
@@ -101,263 +342,431 @@ class DatabaseService:
             ) ENGINE=InnoDB
         """)
         
-        self.connection.commit()
+        # Older tables stored the checksum as 64 hex characters; convert in
+        # place (VARBINARY keeps the bytes so UNHEX can decode them)
+        cursor.execute("""
+            SELECT DATA_TYPE FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'datasets'
+              AND COLUMN_NAME = 'data_checksum'
+        """)
+        checksum_type = cursor.fetchone()
+        if checksum_type and checksum_type[0] == 'varchar':
+            cursor.execute("ALTER TABLE datasets MODIFY data_checksum VARBINARY(64)")
+            cursor.execute("UPDATE datasets SET data_checksum = UNHEX(data_checksum)")
+            cursor.execute("ALTER TABLE datasets MODIFY data_checksum BINARY(32)")
+        
+        # Add composite indexes missing from tables created before they existed
+        cursor.execute("""
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'aggregated_accounts'
+        """)
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [
+            f"ADD INDEX {index_name} {columns}"
+            for index_name, columns in self.ACCOUNT_INDEXES.items()
+            if index_name not in existing
+        ]
+        if missing:
+            cursor.execute(f"ALTER TABLE aggregated_accounts {', '.join(missing)}")
+        
+        connection.commit()
         cursor.close()
     
-    def _calculate_ack_count(self, ack_numbers: str) -> int:
-        """Calculate ACK count from acknowledgement numbers string."""
-        if not ack_numbers or not ack_numbers.strip():
-            return 0
-        ack_str = ack_numbers.replace(';', ',')
-        return len([a.strip() for a in ack_str.split(',') if a.strip()])
-    
-    def _calculate_checksum(self, accounts: List[Any]) -> str:
-        """Calculate SHA256 checksum of data for integrity verification."""
-        data_str = ""
-        for acc in accounts:
-            data_str += f"{acc.account_number}|{acc.total_amount}|{acc.total_transactions}|"
-        return hashlib.sha256(data_str.encode()).hexdigest()
+    def _calculate_ack_counts(self, ack_numbers: List[str]) -> List[int]:
+        """
+        Count the ACK numbers in each acknowledgement string.
+        
+        Tokens are split on ',' or ';' and blank tokens are skipped; one
+        Arrow regex kernel counts them over the whole column.
+        """
+        series = pd.Series([a or '' for a in ack_numbers], dtype='string[pyarrow]')
+        counts = series.str.count(self._ACK_TOKEN_PATTERN).to_numpy(dtype=np.int64)
+        # Plain ints: the connector cannot bind NumPy scalars
+        return counts.tolist()
+    
+    def _local_infile_enabled(self, cursor) -> bool:
+        """Whether the server accepts LOAD DATA LOCAL INFILE (read once)."""
+        if self._local_infile is None:
+            cursor.execute("SELECT @@local_infile")
+            self._local_infile = bool(cursor.fetchone()[0])
+        return self._local_infile
+    
+    def _bulk_insert(self, cursor, insert_cursor, rows: Iterable[tuple]) -> int:
+        """
+        Insert rows into aggregated_accounts by the fastest available path.
+        
+        With local_infile enabled on the server the rows are streamed
+        straight into a LOAD DATA LOCAL INFILE file; otherwise they are
+        collected and sent as multi-row INSERTs on insert_cursor, a
+        prepared-statement cursor.
+        
+        Returns the number of rows the server reports as inserted.
+        """
+        if self._local_infile_enabled(cursor):
+            return self._load_rows_infile(cursor, rows)
+        return self._insert_rows(insert_cursor, list(rows), self._statement_budget(cursor))
+    
+    def _load_rows_infile(self, cursor, rows: Iterable[tuple]) -> int:
+        """Stream rows to a TSV file and bulk-load it with LOAD DATA LOCAL INFILE."""
+        escapes = self._INFILE_ESCAPES
+        fd, path = tempfile.mkstemp(suffix='.tsv')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+                for row in rows:
+                    f.write('\t'.join([
+                        v.translate(escapes) if isinstance(v, str)
+                        else _decimal_text(v) if isinstance(v, float)
+                        else str(v)
+                        for v in row
+                    ]))
+                    f.write('\n')
+            
+            cursor.execute(self.LOAD_ACCOUNTS_SQL, (path,))
+            rowcount = cursor.rowcount
+        finally:
+            os.remove(path)
+        
+        # LOCAL loads downgrade conversion errors (e.g. truncation) to
+        # warnings; treat those as a failed save rather than altered data.
+        # Notes (e.g. rounding to the column scale) are not errors.
+        if cursor.warning_count:
+            cursor.execute("SHOW WARNINGS")
+            problems = [w for w in cursor.fetchall() if w[0] != 'Note']
+            if problems:
+                level, code, message = problems[0]
+                raise Exception(
+                    f"DATA INTEGRITY ERROR: bulk load reported {len(problems)} "
+                    f"warnings ({level} {code}: {message})"
+                )
+        
+        return rowcount
+    
+    def _statement_budget(self, cursor) -> int:
+        """Bytes available for one INSERT statement (server max_allowed_packet)."""
+        if self._max_packet is None:
+            cursor.execute("SELECT @@max_allowed_packet")
+            self._max_packet = int(cursor.fetchone()[0])
+        return self._max_packet - len(self.INSERT_ACCOUNTS_SQL) - 1024
+    
+    def _insert_rows(self, cursor, rows: List[tuple], budget: int) -> int:
+        """
+        Insert rows into aggregated_accounts with multi-row INSERT statements.
+        
+        Statements carry ROWS_PER_STATEMENT rows, or fewer when that would
+        exceed budget bytes (max_allowed_packet). On a prepared cursor every
+        full statement has the same text, so the server parses it once and
+        later executions only send binary parameters.
+        """
+        start = 0
+        size = 0
+        inserted = 0
+        
+        for i, row in enumerate(rows):
+            row_size = self.ROW_OVERHEAD_BYTES + 4 * sum(
+                len(v) for v in row if isinstance(v, str)
+            )
+            if i > start and (size + row_size > budget
+                              or i - start == self.ROWS_PER_STATEMENT):
+                inserted += self._execute_multi_insert(cursor, rows[start:i])
+                start = i
+                size = 0
+            size += row_size
+        
+        if start < len(rows):
+            inserted += self._execute_multi_insert(cursor, rows[start:])
+        
+        return inserted
+    
+    def _execute_multi_insert(self, cursor, rows: List[tuple]) -> int:
+        """Run one INSERT ... VALUES (...), (...) for rows; returns rows inserted."""
+        cursor.execute(
+            _multi_insert_sql(len(rows)), tuple(value for row in rows for value in row)
+        )
+        return cursor.rowcount
+
+    def _fetch_dataframe(self, cursor) -> Optional[pd.DataFrame]:
+        """
+        Read the remaining rows of an executed query into a DataFrame.
+        
+        Rows arrive as plain tuples in FETCH_SIZE chunks from an unbuffered
+        cursor and are transposed straight into per-column lists, so neither
+        the full result set nor a dict per row is ever held in memory.
+        """
+        names = list(cursor.column_names)
+        columns = [[] for _ in names]
+        
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            for column, values in zip(columns, zip(*rows)):
+                column.extend(values)
+        
+        if not names or not columns[0]:
+            return None
+        return pd.DataFrame(dict(zip(names, columns)), columns=names)
 
     def save_dataset(self, name: str, description: str, accounts: List[Any], 
-                     source_filename: str = "", progress_callback=None) -> tuple:
-        """Save aggregated accounts to database with FULL DATA INTEGRITY."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return None, f"Connection failed: {self.last_error}"
+                     source_filename: str = "", progress_callback=None,
+                     strict_verify: bool = False) -> tuple:
+        """
+        Save aggregated accounts to database with FULL DATA INTEGRITY.
+        
+        The insert is one transaction and the row counts reported by the
+        server for each batch must add up to len(accounts). strict_verify
+        additionally recounts the stored rows with COUNT(*) before commit.
+        """
+        with DatabaseService._WRITE_LOCK:
+            return self._save_dataset(name, description, accounts,
+                                      source_filename, progress_callback, strict_verify)
+    
+    def _save_dataset(self, name: str, description: str, accounts: List[Any],
+                      source_filename: str, progress_callback, strict_verify: bool) -> tuple:
+        """save_dataset body; callers hold _WRITE_LOCK."""
+        if not self._ensure_pool():
+            return None, f"Connection failed: {self.last_error}"
+        
+        try:
+            connection = self._bulk_load_connection()
+        except Error as e:
+            return None, f"Connection failed: {e}"
         
         dataset_id = None
         
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            insert_cursor = connection.cursor(prepared=True)
             
             total_accounts = len(accounts)
-            total_amount = sum(acc.total_amount for acc in accounts)
-            data_checksum = self._calculate_checksum(accounts)
             
             if total_accounts == 0:
                 return None, "No accounts to save"
             
+            ack_counts = self._calculate_ack_counts(
+                [acc.acknowledgement_numbers for acc in accounts]
+            )
+            
+            # Total amount and checksum are filled in by the final UPDATE,
+            # once the single pass over the accounts has produced them
             cursor.execute("""
                 INSERT INTO datasets (name, description, total_accounts, total_amount, 
                                       data_checksum, source_filename, verified)
-                VALUES (%s, %s, %s, %s, %s, %s, FALSE)
-            """, (name, description, total_accounts, total_amount, data_checksum, source_filename))
+                VALUES (%s, %s, %s, 0, NULL, %s, FALSE)
+            """, (name, description, total_accounts, source_filename))
             
             dataset_id = cursor.lastrowid
             
-            insert_sql = """
-                INSERT INTO aggregated_accounts 
-                (dataset_id, account_number, acknowledgement_numbers, ack_count,
-                 bank_name, ifsc_code, address, district, state,
-                 total_transactions, total_amount, total_disputed_amount, risk_score)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            batch = []
+            # Rows are produced lazily and handed over one batch at a time
+            rows = _AccountRows(accounts, dataset_id, ack_counts)
             inserted_count = 0
             
-            for i, acc in enumerate(accounts):
-                ack_count = self._calculate_ack_count(acc.acknowledgement_numbers)
+            for start in range(0, total_accounts, self.BATCH_SIZE):
+                inserted_count += self._bulk_insert(
+                    cursor, insert_cursor, itertools.islice(rows, self.BATCH_SIZE)
+                )
+                if progress_callback and start + self.BATCH_SIZE < total_accounts:
+                    progress_callback(inserted_count, total_accounts)
+            
+            if inserted_count != total_accounts:
+                raise Exception(f"DATA INTEGRITY ERROR: Expected {total_accounts}, saved {inserted_count}")
+            
+            if strict_verify:
+                # Verify and mark in one round trip: the row only changes when
+                # the stored count matches (verified starts FALSE, so rowcount is 1)
+                cursor.execute("""
+                    UPDATE datasets
+                    SET total_amount = %s, data_checksum = %s, verified = TRUE
+                    WHERE id = %s AND total_accounts = (
+                        SELECT COUNT(*) FROM aggregated_accounts WHERE dataset_id = %s
+                    )
+                """, (rows.total_amount, rows.checksum, dataset_id, dataset_id))
                 
-                batch.append((
-                    dataset_id,
-                    str(acc.account_number) if acc.account_number else '',
-                    str(acc.acknowledgement_numbers) if acc.acknowledgement_numbers else '',
-                    ack_count,
-                    str(acc.bank_name) if acc.bank_name else '',
-                    str(acc.ifsc_code) if acc.ifsc_code else '',
-                    str(acc.address) if acc.address else '',
-                    str(acc.district) if acc.district else '',
-                    str(acc.state) if acc.state else '',
-                    int(acc.total_transactions) if acc.total_transactions else 0,
-                    float(acc.total_amount) if acc.total_amount else 0,
-                    float(acc.total_disputed_amount) if acc.total_disputed_amount else 0,
-                    float(acc.risk_score) if acc.risk_score else 0
-                ))
-                
-                if len(batch) >= self.BATCH_SIZE:
-                    cursor.executemany(insert_sql, batch)
-                    inserted_count += len(batch)
-                    batch = []
-                    if progress_callback:
-                        progress_callback(inserted_count, total_accounts)
-            
-            if batch:
-                cursor.executemany(insert_sql, batch)
-                inserted_count += len(batch)
-            
-            cursor.execute(
-                "SELECT COUNT(*) FROM aggregated_accounts WHERE dataset_id = %s", 
-                (dataset_id,)
-            )
-            saved_count = cursor.fetchone()[0]
-            
-            if saved_count != total_accounts:
-                raise Exception(f"DATA INTEGRITY ERROR: Expected {total_accounts}, saved {saved_count}")
-            
-            cursor.execute("UPDATE datasets SET verified = TRUE WHERE id = %s", (dataset_id,))
-            self.connection.commit()
+                if cursor.rowcount != 1:
+                    cursor.execute(
+                        "SELECT COUNT(*) FROM aggregated_accounts WHERE dataset_id = %s", 
+                        (dataset_id,)
+                    )
+                    saved_count = cursor.fetchone()[0]
+                    raise Exception(f"DATA INTEGRITY ERROR: Expected {total_accounts}, saved {saved_count}")
+            else:
+                cursor.execute("""
+                    UPDATE datasets
+                    SET total_amount = %s, data_checksum = %s, verified = TRUE
+                    WHERE id = %s
+                """, (rows.total_amount, rows.checksum, dataset_id))
+            
+            connection.commit()
             
             if progress_callback:
                 progress_callback(total_accounts, total_accounts)
             
+            insert_cursor.close()
             cursor.close()
             return dataset_id, ""
             
         except Exception as e:
             error_msg = str(e)
             try:
-                self.connection.rollback()
+                connection.rollback()
                 if dataset_id:
-                    cursor = self.connection.cursor()
+                    cursor = connection.cursor()
                     cursor.execute("DELETE FROM datasets WHERE id = %s", (dataset_id,))
-                    self.connection.commit()
+                    connection.commit()
                     cursor.close()
             except:
                 pass
             return None, f"Save failed: {error_msg}"
+        finally:
+            connection.close()
 
     def get_all_datasets(self) -> List[Dict[str, Any]]:
         """Get list of all saved datasets."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return []
+        if not self._ensure_pool():
+            return []
         
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT id, name, description, total_accounts, total_amount, 
-                       created_at, source_filename, verified
-                FROM datasets ORDER BY created_at DESC
-            """)
-            results = cursor.fetchall()
-            cursor.close()
-            return results
+            with self._conn() as conn:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute("""
+                    SELECT id, name, description, total_accounts, total_amount, 
+                           created_at, source_filename, verified
+                    FROM datasets ORDER BY created_at DESC
+                """)
+                results = cursor.fetchall()
+                cursor.close()
+                return results
         except Error as e:
             return []
     
     def load_dataset(self, dataset_id: int, limit: int = None, offset: int = 0) -> Optional[pd.DataFrame]:
         """Load dataset with optional pagination."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return None
+        if not self._ensure_pool():
+            return None
         
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            
-            sql = """
-                SELECT 
-                    account_number AS `Fraudster Bank Account Number`,
-                    acknowledgement_numbers AS `All Acknowledgement Numbers`,
-                    ack_count AS `ACK Count`,
-                    bank_name AS `Bank Name`,
-                    ifsc_code AS `IFSC Code`,
-                    address AS `Address`,
-                    district AS `District`,
-                    state AS `State`,
-                    total_transactions AS `Total Transactions`,
-                    total_amount AS `Total Amount`,
-                    total_disputed_amount AS `Total Disputed Amount`,
-                    risk_score AS `Risk Score`
-                FROM aggregated_accounts
-                WHERE dataset_id = %s
-                ORDER BY total_amount DESC
-            """
-            
-            if limit:
-                sql += f" LIMIT {limit} OFFSET {offset}"
-            
-            cursor.execute(sql, (dataset_id,))
-            results = cursor.fetchall()
-            cursor.close()
-            
-            return pd.DataFrame(results) if results else None
-            
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                
+                sql = self.LOAD_SELECT_SQL + " ORDER BY total_amount DESC"
+                params = [dataset_id]
+                
+                if limit:
+                    sql += " LIMIT %s OFFSET %s"
+                    params.extend([int(limit), int(offset)])
+                
+                cursor.execute(sql, params)
+                df = self._fetch_dataframe(cursor)
+                cursor.close()
+                
+                return df
+                
         except Error as e:
             return None
     
+    def load_dataset_chunked(self, dataset_id: int,
+                             chunk_size: int = 50000) -> Generator[pd.DataFrame, None, None]:
+        """Stream a whole dataset as DataFrames of up to chunk_size rows."""
+        if not self._ensure_pool():
+            return
+        
+        try:
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.LOAD_SELECT_SQL + " ORDER BY total_amount DESC", (dataset_id,))
+                names = list(cursor.column_names)
+                
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield pd.DataFrame.from_records(rows, columns=names)
+                
+                cursor.close()
+                
+        except Error as e:
+            return
+    
     def delete_dataset(self, dataset_id: int) -> bool:
         """Delete a dataset and all its accounts."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return False
+        if not self._ensure_pool():
+            return False
         
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM datasets WHERE id = %s", (dataset_id,))
-            self.connection.commit()
-            cursor.close()
-            return True
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM datasets WHERE id = %s", (dataset_id,))
+                conn.commit()
+                cursor.close()
+                return True
         except Error as e:
-            self.connection.rollback()
             return False
     
     def get_dataset_count(self, dataset_id: int) -> int:
         """Get total row count for a dataset."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return 0
+        if not self._ensure_pool():
+            return 0
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(
-                "SELECT COUNT(*) FROM aggregated_accounts WHERE dataset_id = %s", 
-                (dataset_id,)
-            )
-            count = cursor.fetchone()[0]
-            cursor.close()
-            return count
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT COUNT(*) FROM aggregated_accounts WHERE dataset_id = %s", 
+                    (dataset_id,)
+                )
+                count = cursor.fetchone()[0]
+                cursor.close()
+                return count
         except:
             return 0
     
     def get_dataset_info(self, dataset_id: int) -> Optional[Dict[str, Any]]:
         """Get metadata for a specific dataset."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return None
+        if not self._ensure_pool():
+            return None
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT id, name, description, total_accounts, total_amount, 
-                       created_at, source_filename, verified
-                FROM datasets WHERE id = %s
-            """, (dataset_id,))
-            result = cursor.fetchone()
-            cursor.close()
-            return result
+            with self._conn() as conn:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute("""
+                    SELECT id, name, description, total_accounts, total_amount, 
+                           created_at, source_filename, verified
+                    FROM datasets WHERE id = %s
+                """, (dataset_id,))
+                result = cursor.fetchone()
+                cursor.close()
+                return result
         except:
             return None
     
     def verify_dataset_integrity(self, dataset_id: int) -> tuple:
         """Verify data integrity of a saved dataset."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return False, "Connection failed"
+        if not self._ensure_pool():
+            return False, "Connection failed"
         
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT total_accounts, total_amount FROM datasets WHERE id = %s",
-                (dataset_id,)
-            )
-            dataset = cursor.fetchone()
-            
-            if not dataset:
-                return False, "Dataset not found"
-            
-            cursor.execute(
-                "SELECT COUNT(*) as cnt, SUM(total_amount) as amt FROM aggregated_accounts WHERE dataset_id = %s",
-                (dataset_id,)
-            )
-            result = cursor.fetchone()
-            actual_count = result['cnt']
-            actual_amount = result['amt'] or 0
-            cursor.close()
-            
-            if actual_count != dataset['total_accounts']:
-                return False, f"Count mismatch: expected {dataset['total_accounts']}, found {actual_count}"
-            
-            return True, f"✅ Verified: {actual_count:,} records, ₹{float(actual_amount):,.2f}"
-            
+            with self._conn() as conn:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(
+                    "SELECT total_accounts, total_amount FROM datasets WHERE id = %s",
+                    (dataset_id,)
+                )
+                dataset = cursor.fetchone()
+                
+                if not dataset:
+                    return False, "Dataset not found"
+                
+                cursor.execute(
+                    "SELECT COUNT(*) as cnt, SUM(total_amount) as amt FROM aggregated_accounts WHERE dataset_id = %s",
+                    (dataset_id,)
+                )
+                result = cursor.fetchone()
+                actual_count = result['cnt']
+                actual_amount = result['amt'] or 0
+                cursor.close()
+                
+                if actual_count != dataset['total_accounts']:
+                    return False, f"Count mismatch: expected {dataset['total_accounts']}, found {actual_count}"
+                
+                return True, f"✅ Verified: {actual_count:,} records, ₹{float(actual_amount):,.2f}"
+                
         except Error as e:
             return False, f"Error: {str(e)}"
     
@@ -368,74 +777,47 @@ class DatabaseService:
                                min_amount: float = None, max_amount: float = None,
                                min_transactions: int = None, min_ack_count: int = None) -> Optional[pd.DataFrame]:
         """Load dataset with Excel-like filtering and sorting."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return None
+        if not self._ensure_pool():
+            return None
         
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            
-            sql = """
-                SELECT 
-                    account_number AS `Fraudster Bank Account Number`,
-                    acknowledgement_numbers AS `All Acknowledgement Numbers`,
-                    ack_count AS `ACK Count`,
-                    bank_name AS `Bank Name`,
-                    ifsc_code AS `IFSC Code`,
-                    address AS `Address`,
-                    district AS `District`,
-                    state AS `State`,
-                    total_transactions AS `Total Transactions`,
-                    total_amount AS `Total Amount`,
-                    total_disputed_amount AS `Total Disputed Amount`,
-                    risk_score AS `Risk Score`
-                FROM aggregated_accounts
-                WHERE dataset_id = %s
-            """
-            params = [dataset_id]
-            
-            if filter_account:
-                sql += " AND account_number LIKE %s"
-                params.append(f"%{filter_account}%")
-            if filter_bank:
-                sql += " AND bank_name LIKE %s"
-                params.append(f"%{filter_bank}%")
-            if filter_district:
-                sql += " AND district LIKE %s"
-                params.append(f"%{filter_district}%")
-            if filter_state:
-                sql += " AND state LIKE %s"
-                params.append(f"%{filter_state}%")
-            if min_amount and min_amount > 0:
-                sql += " AND total_amount >= %s"
-                params.append(min_amount)
-            if max_amount and max_amount > 0:
-                sql += " AND total_amount <= %s"
-                params.append(max_amount)
-            if min_transactions and min_transactions > 0:
-                sql += " AND total_transactions >= %s"
-                params.append(min_transactions)
-            if min_ack_count and min_ack_count > 0:
-                sql += " AND ack_count >= %s"
-                params.append(min_ack_count)
-            
-            valid_columns = ['account_number', 'bank_name', 'district', 'state', 
-                           'total_amount', 'total_transactions', 'ack_count', 'risk_score']
-            if sort_column not in valid_columns:
-                sort_column = 'total_amount'
-            
-            sort_order = 'DESC' if sort_order.upper() == 'DESC' else 'ASC'
-            sql += f" ORDER BY {sort_column} {sort_order}"
-            
-            if limit:
-                sql += f" LIMIT {int(limit)}"
-            
-            cursor.execute(sql, params)
-            results = cursor.fetchall()
-            cursor.close()
-            
-            return pd.DataFrame(results) if results else None
-            
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                
+                values = (filter_account, filter_bank, filter_district, filter_state,
+                          min_amount, max_amount, min_transactions, min_ack_count)
+                clauses = []
+                params = [dataset_id]
+                
+                for (clause, is_text), value in zip(_FILTER_CLAUSES, values):
+                    if is_text:
+                        if value:
+                            clauses.append(clause)
+                            params.append(f"%{value}%")
+                    elif value and value > 0:
+                        clauses.append(clause)
+                        params.append(value)
+                
+                sql = self.LOAD_SELECT_SQL
+                if clauses:
+                    sql += " AND " + " AND ".join(clauses)
+                
+                if sort_column not in _VALID_SORT_COLUMNS:
+                    sort_column = 'total_amount'
+                
+                sort_order = 'DESC' if sort_order.upper() == 'DESC' else 'ASC'
+                sql += f" ORDER BY {sort_column} {sort_order}"
+                
+                if limit:
+                    sql += " LIMIT %s"
+                    params.append(int(limit))
+                
+                cursor.execute(sql, params)
+                df = self._fetch_dataframe(cursor)
+                cursor.close()
+                
+                return df
+                
         except Error as e:
             return None
     
@@ -443,46 +825,47 @@ class DatabaseService:
                         district: str = None, min_amount: float = None,
                         limit: int = 1000) -> Optional[pd.DataFrame]:
         """Fast indexed search."""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return None
+        if not self._ensure_pool():
+            return None
         
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            
-            sql = """
-                SELECT 
-                    account_number AS `Fraudster Bank Account Number`,
-                    acknowledgement_numbers AS `All Acknowledgement Numbers`,
-                    ack_count AS `ACK Count`,
-                    bank_name AS `Bank Name`,
-                    ifsc_code AS `IFSC Code`,
-                    district AS `District`,
-                    state AS `State`,
-                    total_transactions AS `Total Transactions`,
-                    total_amount AS `Total Amount`
-                FROM aggregated_accounts WHERE dataset_id = %s
-            """
-            params = [dataset_id]
-            
-            if account_number:
-                sql += " AND account_number LIKE %s"
-                params.append(f"%{account_number}%")
-            if district:
-                sql += " AND district LIKE %s"
-                params.append(f"%{district}%")
-            if min_amount:
-                sql += " AND total_amount >= %s"
-                params.append(min_amount)
-            
-            sql += f" ORDER BY total_amount DESC LIMIT {limit}"
-            
-            cursor.execute(sql, params)
-            results = cursor.fetchall()
-            cursor.close()
-            
-            return pd.DataFrame(results) if results else None
-            
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                
+                sql = """
+                    SELECT 
+                        account_number AS `Fraudster Bank Account Number`,
+                        acknowledgement_numbers AS `All Acknowledgement Numbers`,
+                        ack_count AS `ACK Count`,
+                        bank_name AS `Bank Name`,
+                        ifsc_code AS `IFSC Code`,
+                        district AS `District`,
+                        state AS `State`,
+                        total_transactions AS `Total Transactions`,
+                        total_amount AS `Total Amount`
+                    FROM aggregated_accounts WHERE dataset_id = %s
+                """
+                params = [dataset_id]
+                
+                if account_number:
+                    sql += " AND account_number LIKE %s"
+                    params.append(f"%{account_number}%")
+                if district:
+                    sql += " AND district LIKE %s"
+                    params.append(f"%{district}%")
+                if min_amount:
+                    sql += " AND total_amount >= %s"
+                    params.append(min_amount)
+                
+                sql += " ORDER BY total_amount DESC LIMIT %s"
+                params.append(int(limit))
+                
+                cursor.execute(sql, params)
+                df = self._fetch_dataframe(cursor)
+                cursor.close()
+                
+                return df
+                
         except Error as e:
             return None
     
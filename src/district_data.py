@@ -13,9 +13,21 @@ Performance optimizations:
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 from io import BytesIO
-from typing import List, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import os
+import stat
+import tempfile
 import time
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from src.file_cache import evict_files, mark_used
+from src.file_readers import EXCEL_READ_ENGINE, read_csv_as_text, write_streamed_workbook
 
 # Gujarat Districts (33 districts)
 GUJARAT_DISTRICTS = [
@@ -68,57 +80,289 @@ INDIA_STATES_DISTRICTS = {
 }
 
 # Flat list for search
-ALL_DISTRICTS_FLAT = []
-for state, districts in INDIA_STATES_DISTRICTS.items():
-    for district in districts:
-        ALL_DISTRICTS_FLAT.append({"state": state, "district": district})
+ALL_DISTRICTS_FLAT = [
+    {"state": state, "district": district}
+    for state, districts in INDIA_STATES_DISTRICTS.items()
+    for district in districts
+]
 
 
 # ============== OPTIMIZED HELPER FUNCTIONS ==============
 
-@st.cache_data(show_spinner=False)
-def read_file_cached(file_content: bytes, filename: str) -> pd.DataFrame:
-    """Read file with caching for performance."""
+# Parsed uploads are also kept on disk by content hash, so other sessions and
+# server restarts skip parsing. Uploads hold victim/suspect details, so the
+# directory is private to the app's user (0o700, files 0o600) and the cache is
+# skipped if it is not. Files unused for UPLOAD_CACHE_MAX_AGE_SECONDS are
+# deleted, and least recently used files go past the size cap.
+UPLOAD_CACHE_DIR = Path(tempfile.gettempdir()) / "district_data_uploads"
+UPLOAD_CACHE_MAX_BYTES = 2 * 1024 ** 3
+UPLOAD_CACHE_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+def _parse_file(file_content: bytes, filename: str) -> pd.DataFrame:
+    """Parse uploaded file bytes into an all-text DataFrame."""
     buffer = BytesIO(file_content)
     if filename.lower().endswith('.csv'):
-        return pd.read_csv(buffer, low_memory=False, dtype=str)
+        return read_csv_as_text(buffer)
     else:
-        return pd.read_excel(buffer, dtype=str)
+        # calamine is much faster than openpyxl when python-calamine is installed
+        return pd.read_excel(buffer, engine=EXCEL_READ_ENGINE, dtype=str)
+
+
+def _upload_cache_dir() -> Optional[Path]:
+    """
+    Return the disk cache directory, creating it private to this user.
+    Returns None when it is not safe to use, e.g. it was created by another
+    user or is readable by others.
+    """
+    try:
+        UPLOAD_CACHE_DIR.mkdir(mode=0o700, exist_ok=True)
+        info = UPLOAD_CACHE_DIR.lstat()
+    except OSError:
+        return None
+    
+    if not stat.S_ISDIR(info.st_mode):
+        return None
+    # Ownership and mode bits are only meaningful on POSIX
+    if hasattr(os, 'getuid') and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+        return None
+    return UPLOAD_CACHE_DIR
+
+
+def _store_parsed_file(cache_dir: Path, path: Path, df: pd.DataFrame) -> None:
+    """Write a parsed upload to the disk cache, then evict expired and least recently used files."""
+    # Feather stores headers as text, so e.g. numeric Excel headers would not round-trip
+    if not all(isinstance(col, str) for col in df.columns):
+        return
+    
+    # Write under a temp name so concurrent sessions never read a partial file
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        df.to_feather(temp_path, compression='zstd')
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, path)
+    except (OSError, ValueError, pa.ArrowException):
+        temp_path.unlink(missing_ok=True)
+        return
+    
+    evict_files(cache_dir, "*.feather", UPLOAD_CACHE_MAX_BYTES, UPLOAD_CACHE_MAX_AGE_SECONDS, keep=path)
+
+
+@st.cache_data(show_spinner=False)
+def read_file_cached(file_hash: str, _file_content: bytes, filename: str) -> pd.DataFrame:
+    """
+    Read file with caching for performance.
+    Keyed by file_hash; the raw bytes are not hashed by Streamlit on each call.
+    """
+    cache_dir = _upload_cache_dir()
+    if cache_dir is None:
+        return _parse_file(_file_content, filename)
+    
+    path = cache_dir / f"{file_hash}.feather"
+    try:
+        df = pd.read_feather(path)
+        mark_used(path)
+        return df
+    except (OSError, pa.ArrowException):
+        pass
+    
+    df = _parse_file(_file_content, filename)
+    _store_parsed_file(cache_dir, path, df)
+    return df
+
+
+def load_uploaded_file(uploaded_file, state_key: str) -> Tuple[pd.DataFrame, str]:
+    """
+    Return (df, file_hash) for an upload, parsing it once per session.
+    The content hash is computed once per upload and keys every per-file cache;
+    the frame is kept in session state so reruns skip the cache lookup too.
+    """
+    loaded = st.session_state.get(state_key)
+    if loaded is not None and loaded[0] == uploaded_file.file_id:
+        return loaded[2], loaded[1]
+    
+    file_content = uploaded_file.getvalue()
+    file_hash = hashlib.blake2b(file_content, digest_size=16).hexdigest()
+    df = read_file_cached(file_hash, file_content, uploaded_file.name)
+    st.session_state[state_key] = (uploaded_file.file_id, file_hash, df)
+    return df, file_hash
 
 
 def generate_excel_bytes(df: pd.DataFrame) -> bytes:
-    """Generate Excel file bytes from DataFrame."""
+    """Generate Excel file bytes for a District Data download."""
+    return write_streamed_workbook(df, 'District Data')
+
+
+def generate_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Generate CSV file bytes from DataFrame using Arrow's multithreaded CSV writer."""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (ValueError, pa.ArrowException):
+        # Duplicate headers or mixed-type object columns: use pandas' writer
+        return df.to_csv(index=False).encode('utf-8')
+    output = pa.BufferOutputStream()
+    pa_csv.write_csv(table, output)
+    return output.getvalue().to_pybytes()
+
+
+def generate_parquet_bytes(df: pd.DataFrame) -> bytes:
+    """Generate zstd-compressed Parquet file bytes from DataFrame."""
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='District Data')
+    df.to_parquet(output, engine='pyarrow', index=False, compression='zstd', use_dictionary=True)
     return output.getvalue()
 
 
-def filter_by_column(df: pd.DataFrame, column: str, value: str) -> pd.DataFrame:
-    """Fast vectorized filtering by single column."""
-    mask = df[column].astype(str).str.lower().str.strip() == value.lower().strip()
-    return df.loc[mask].copy()
+# Download formats: label -> (generator, extension, mime)
+EXPORT_FORMATS = {
+    "Excel (.xlsx)": (generate_excel_bytes, "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV (.csv)": (generate_csv_bytes, "csv", "text/csv"),
+    "Parquet (.parquet)": (generate_parquet_bytes, "parquet", "application/vnd.apache.parquet"),
+}
+
+# Above this many rows the user can pick CSV or Parquet instead of Excel
+LARGE_EXPORT_ROWS = 500_000
+
+# Data rows that fit on one Excel sheet (1,048,576 minus the header row)
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def render_preview(label: str, df: pd.DataFrame, rows: int, key: str, expanded: bool = False):
+    """
+    Show the first rows of df in an expander.
+    The expander tracks its open state, so the table is only built while it is open.
+    """
+    expander = st.expander(label, expanded=expanded, key=key, on_change="rerun")
+    if expander.open:
+        with expander:
+            st.dataframe(df.head(rows), use_container_width=True)
+
+
+def render_download_button(df: pd.DataFrame, label: str, file_stem: str, key: str, primary: bool = False):
+    """
+    Render a download button for df.
+    Large frames get a format choice; the file is built only when the button is clicked.
+    """
+    formats = list(EXPORT_FORMATS)
+    if len(df) > EXCEL_MAX_ROWS:
+        formats.remove("Excel (.xlsx)")
+    
+    if len(df) > LARGE_EXPORT_ROWS:
+        export_format = st.radio(
+            "Download format",
+            options=formats,
+            horizontal=True,
+            key=f"{key}_format",
+            help="CSV and Parquet are much faster to build than Excel for large downloads"
+        )
+    else:
+        export_format = formats[0]
+    
+    generator, extension, mime = EXPORT_FORMATS[export_format]
+    st.download_button(
+        label=label,
+        data=lambda: generator(df),
+        file_name=f"{file_stem}.{extension}",
+        mime=mime,
+        use_container_width=True,
+        type="primary" if primary else "secondary",
+        key=key
+    )
+
+
+def _normalize_column(series: pd.Series) -> pd.Categorical:
+    """Stripped, lowercased categorical copy of a column (NA stays NA)."""
+    return pd.Categorical(series.astype('string').str.strip().str.lower())
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _normalized_column(df_key: str, _df: pd.DataFrame, column: str) -> pd.Categorical:
+    """Normalized categorical view of one column, computed once per frame key."""
+    return _normalize_column(_df[column])
+
 
+def _column_equals(df: pd.DataFrame, column: str, value: str, df_key: str = None) -> np.ndarray:
+    """Boolean mask of rows whose normalized column value equals value."""
+    if df_key is None:
+        normalized = _normalize_column(df[column])
+    else:
+        normalized = _normalized_column(df_key, df, column)
+    
+    # Compare integer category codes instead of strings
+    try:
+        target = normalized.categories.get_loc(value.lower().strip())
+    except KeyError:
+        return np.zeros(len(df), dtype=bool)
+    return normalized.codes == target
+
+
+def filter_by_column(df: pd.DataFrame, column: str, value: str, df_key: str = None) -> pd.DataFrame:
+    """
+    Fast vectorized filtering by single column.
+    df_key identifies the frame (e.g. the upload) so its normalized column is cached across reruns.
+    The result is not copied again after the row gather; callers must not mutate it in place.
+    """
+    mask = _column_equals(df, column, value, df_key)
+    return df.iloc[np.flatnonzero(mask)]
 
-def filter_by_two_columns(df: pd.DataFrame, col1: str, val1: str, col2: str, val2: str) -> pd.DataFrame:
+
+def filter_by_two_columns(df: pd.DataFrame, col1: str, val1: str, col2: str, val2: str,
+                          df_key: str = None) -> pd.DataFrame:
     """Fast vectorized filtering by two columns."""
-    mask1 = df[col1].astype(str).str.lower().str.strip() == val1.lower().strip()
-    mask2 = df[col2].astype(str).str.lower().str.strip() == val2.lower().strip()
-    return df.loc[mask1 & mask2].copy()
+    mask = _column_equals(df, col1, val1, df_key) & _column_equals(df, col2, val2, df_key)
+    return df.iloc[np.flatnonzero(mask)]
+
+
+def _unique_names(series: pd.Series) -> List[str]:
+    """Sorted distinct non-blank values of a column, stripped."""
+    # De-duplicate the raw values first so only the distinct ones are normalized
+    names = {str(value).strip() for value in series.dropna().unique()}
+    return sorted([n for n in names if n and n.lower() != 'nan'])
 
 
-def get_unique_states(df: pd.DataFrame, state_col: str) -> List[str]:
-    """Get unique states from file."""
-    states = df[state_col].dropna().astype(str).str.strip().unique().tolist()
-    return sorted([s for s in states if s and s.lower() != 'nan'])
+@st.cache_data(show_spinner=False, max_entries=32)
+def _unique_names_cached(df_key: str, _df: pd.DataFrame, column: str) -> List[str]:
+    """_unique_names for one column, computed once per frame key."""
+    return _unique_names(_df[column])
 
 
-def get_unique_districts(df: pd.DataFrame, district_col: str, state_col: str = None, state: str = None) -> List[str]:
-    """Get unique districts, optionally filtered by state."""
+@st.cache_data(show_spinner=False, max_entries=32)
+def _districts_by_state(df_key: str, _df: pd.DataFrame, district_col: str, state_col: str) -> Dict[str, List[str]]:
+    """
+    Map each normalized state to its unique districts, built once per frame key.
+    States are normalized as in filter_by_column, so lookups match that filter.
+    """
+    pairs = pd.DataFrame({
+        'state': _normalized_column(df_key, _df, state_col),
+        'district': _df[district_col].to_numpy()
+    }).dropna().drop_duplicates()
+    return {
+        state: _unique_names(group['district'])
+        for state, group in pairs.groupby('state', observed=True, sort=False)
+    }
+
+
+def get_unique_states(df: pd.DataFrame, state_col: str, df_key: str = None) -> List[str]:
+    """Get unique states from file (cached per frame when df_key is given)."""
+    if df_key is not None:
+        return _unique_names_cached(df_key, df, state_col)
+    return _unique_names(df[state_col])
+
+
+def get_unique_districts(df: pd.DataFrame, district_col: str, state_col: str = None, state: str = None,
+                         df_key: str = None) -> List[str]:
+    """Get unique districts, optionally filtered by state (cached per frame when df_key is given)."""
+    if df_key is not None:
+        if state_col and state:
+            return _districts_by_state(df_key, df, district_col, state_col).get(state.lower().strip(), [])
+        return _unique_names_cached(df_key, df, district_col)
+    
     if state_col and state:
         df = filter_by_column(df, state_col, state)
-    districts = df[district_col].dropna().astype(str).str.strip().unique().tolist()
-    return sorted([d for d in districts if d and d.lower() != 'nan'])
+    return _unique_names(df[district_col])
+
+
+# Columns match_files_fast adds from the victim file, in output order
+MATCH_VICTIM_COLUMNS = ['Victim District', 'Victim State', 'Reported Amount (Victim)']
 
 
 def match_files_fast(suspect_df: pd.DataFrame, victim_df: pd.DataFrame,
@@ -126,46 +370,46 @@ def match_files_fast(suspect_df: pd.DataFrame, victim_df: pd.DataFrame,
                      victim_district_col: str, victim_state_col: str,
                      victim_amount_col: str) -> Tuple[pd.DataFrame, int]:
     """
-    OPTIMIZED matching using pandas merge (100x faster than loops).
-    Reorders columns to put Victim data after ACK Number.
+    OPTIMIZED matching using a hashed ACK lookup (100x faster than loops).
+    Inserts the Victim columns right after the ACK Number column.
     """
-    suspect_df = suspect_df.copy()
-    victim_df = victim_df.copy()
-    
     # Normalize ACK for matching
-    suspect_df['_ack_key'] = suspect_df[suspect_ack_col].astype(str).str.strip().str.upper()
-    victim_df['_ack_key'] = victim_df[victim_ack_col].astype(str).str.strip().str.upper()
-    
-    # Prepare victim columns for merge
-    victim_merge = victim_df[['_ack_key', victim_district_col, victim_state_col, victim_amount_col]].copy()
-    victim_merge.columns = ['_ack_key', 'Victim District', 'Victim State', 'Reported Amount (Victim)']
-    victim_merge = victim_merge.drop_duplicates(subset=['_ack_key'], keep='first')
-    
-    # Merge
-    result_df = suspect_df.merge(victim_merge, on='_ack_key', how='left')
-    match_count = result_df['Victim District'].notna().sum()
-    
-    # Fill blanks
-    result_df['Victim District'] = result_df['Victim District'].fillna('')
-    result_df['Victim State'] = result_df['Victim State'].fillna('')
-    result_df['Reported Amount (Victim)'] = result_df['Reported Amount (Victim)'].fillna('')
-    
-    # Cleanup temp column
-    result_df = result_df.drop(columns=['_ack_key'])
-    
-    # REORDER COLUMNS: Put Victim columns right after ACK Number
-    original_cols = list(suspect_df.columns)
-    original_cols.remove('_ack_key')  # Remove temp column from list
-    
-    # Find position of ACK column
-    ack_position = original_cols.index(suspect_ack_col) + 1
-    
-    # Build new column order
-    new_order = original_cols[:ack_position]  # Columns up to and including ACK
-    new_order.extend(['Victim District', 'Victim State', 'Reported Amount (Victim)'])  # Add victim columns
-    new_order.extend(original_cols[ack_position:])  # Rest of the columns
-    
-    result_df = result_df[new_order]
+    suspect_key = suspect_df[suspect_ack_col].astype(str).str.strip().str.upper()
+    
+    # Prepare victim columns for merge (a projection, not a copy of the whole frame)
+    victim_merge = pd.DataFrame({
+        '_ack_key': victim_df[victim_ack_col].astype(str).str.strip().str.upper(),
+        'Victim District': victim_df[victim_district_col],
+        'Victim State': victim_df[victim_state_col],
+        'Reported Amount (Victim)': victim_df[victim_amount_col],
+    })
+    # One row per ACK, indexed by key: the lookup is many-to-one by construction
+    victim_merge = victim_merge.drop_duplicates(subset=['_ack_key'], keep='first').set_index('_ack_key')
+    
+    # Row of each suspect key in the victim index, from Arrow's C++ hash lookup (-1 = no match)
+    positions = pc.index_in(pa.array(suspect_key), value_set=pa.array(victim_merge.index))
+    positions = positions.fill_null(-1).to_numpy()
+    
+    # A suspect row counts as matched when its victim row has a district; the
+    # appended False is what position -1 (no match) picks up
+    has_district = np.append(victim_merge['Victim District'].notna().to_numpy(), False)
+    match_count = np.count_nonzero(has_district[positions])
+    
+    # Fill blanks on the de-duplicated victim rows, then gather them for every
+    # suspect row ('' where there is no match)
+    victim_merge = victim_merge.fillna('')
+    victim_cols = {
+        col: pd.Series(victim_merge[col].array.take(positions, allow_fill=True, fill_value=''),
+                       index=suspect_df.index)
+        for col in MATCH_VICTIM_COLUMNS
+    }
+    
+    # Put Victim columns right after ACK Number; insert() adds them to a shallow
+    # copy of the suspect frame without rebuilding its other columns
+    result_df = suspect_df.copy(deep=False)
+    ack_position = list(result_df.columns).index(suspect_ack_col) + 1
+    for offset, col in enumerate(MATCH_VICTIM_COLUMNS):
+        result_df.insert(ack_position + offset, col, victim_cols[col])
     
     return result_df, int(match_count)
 
@@ -217,13 +461,12 @@ def render_victim_tab():
     # Read file
     start_time = time.time()
     with st.spinner("Loading file..."):
-        df = read_file_cached(uploaded_file.getvalue(), uploaded_file.name)
+        df, file_hash = load_uploaded_file(uploaded_file, "victim_file_tab1_loaded")
     load_time = time.time() - start_time
     
     st.success(f"✅ File loaded: **{len(df):,}** rows, **{len(df.columns)}** columns ({load_time:.2f}s)")
     
-    with st.expander("📋 Preview Data (First 5 rows)", expanded=False):
-        st.dataframe(df.head(), use_container_width=True)
+    render_preview("📋 Preview Data (First 5 rows)", df, 5, key="victim_preview_tab1")
     
     st.markdown("---")
     
@@ -258,23 +501,20 @@ def render_victim_tab():
     # Filter
     with st.spinner(f"Filtering {len(df):,} rows..."):
         start_time = time.time()
-        filtered_df = filter_by_column(df, district_col, selected_district)
+        filtered_df = filter_by_column(df, district_col, selected_district, file_hash)
         filter_time = time.time() - start_time
     
     if len(filtered_df) > 0:
         st.success(f"✅ Found **{len(filtered_df):,} records** for {selected_district} ({filter_time:.2f}s)")
         
-        with st.expander(f"Preview {selected_district} Data", expanded=False):
-            st.dataframe(filtered_df.head(10), use_container_width=True)
+        render_preview(f"Preview {selected_district} Data", filtered_df, 10, key="victim_district_preview_tab1")
         
-        excel_bytes = generate_excel_bytes(filtered_df)
-        st.download_button(
+        render_download_button(
+            filtered_df,
             label=f"⬇️ Download {selected_district} Victim Data ({len(filtered_df):,} records)",
-            data=excel_bytes,
-            file_name=f"victim_{selected_district.replace(' ', '_')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True,
-            type="primary"
+            file_stem=f"victim_{selected_district.replace(' ', '_')}",
+            key="victim_download_tab1",
+            primary=True
         )
     else:
         st.warning(f"⚠️ No records found for {selected_district}")
@@ -300,13 +540,12 @@ def render_suspect_tab():
     # Read file
     start_time = time.time()
     with st.spinner("Loading file..."):
-        df = read_file_cached(uploaded_file.getvalue(), uploaded_file.name)
+        df, file_hash = load_uploaded_file(uploaded_file, "suspect_file_tab2_loaded")
     load_time = time.time() - start_time
     
     st.success(f"✅ File loaded: **{len(df):,}** rows, **{len(df.columns)}** columns ({load_time:.2f}s)")
     
-    with st.expander("📋 Preview Data (First 5 rows)", expanded=False):
-        st.dataframe(df.head(), use_container_width=True)
+    render_preview("📋 Preview Data (First 5 rows)", df, 5, key="suspect_preview_tab2")
     
     st.markdown("---")
     
@@ -339,18 +578,18 @@ def render_suspect_tab():
     browse_tab, search_tab = st.tabs(["📂 Browse by State", "🔍 Search District"])
     
     with browse_tab:
-        render_suspect_browse_section(df, district_col, state_col)
+        render_suspect_browse_section(df, district_col, state_col, file_hash)
     
     with search_tab:
-        render_suspect_search_section(df, district_col)
+        render_suspect_search_section(df, district_col, file_hash)
 
 
-def render_suspect_browse_section(df: pd.DataFrame, district_col: str, state_col: str):
+def render_suspect_browse_section(df: pd.DataFrame, district_col: str, state_col: str, df_key: str):
     """Render browse by state section."""
     st.markdown("### Select State → District")
     
     # Get states from FILE (not predefined list)
-    available_states = get_unique_states(df, state_col)
+    available_states = get_unique_states(df, state_col, df_key)
     
     if not available_states:
         st.warning("No states found in the file")
@@ -372,17 +611,15 @@ def render_suspect_browse_section(df: pd.DataFrame, district_col: str, state_col
     st.markdown(f"#### 📦 Download All {selected_state} Data")
     
     with st.spinner("Filtering by state..."):
-        all_state_data = filter_by_column(df, state_col, selected_state)
+        all_state_data = filter_by_column(df, state_col, selected_state, df_key)
     
     if len(all_state_data) > 0:
         st.success(f"✅ Found **{len(all_state_data):,} total records** for {selected_state}")
-        excel_bytes = generate_excel_bytes(all_state_data)
-        st.download_button(
+        render_download_button(
+            all_state_data,
             label=f"⬇️ Download ALL {selected_state} Data ({len(all_state_data):,} records)",
-            data=excel_bytes,
-            file_name=f"suspect_{selected_state.replace(' ', '_')}_ALL.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
+            file_stem=f"suspect_{selected_state.replace(' ', '_')}_ALL",
+            key="suspect_state_download_tab2"
         )
     else:
         st.warning(f"No records found for {selected_state}")
@@ -391,7 +628,7 @@ def render_suspect_browse_section(df: pd.DataFrame, district_col: str, state_col
     st.markdown(f"#### 📍 Or Select Specific District in {selected_state}")
     
     # Get districts from FILE for selected state
-    available_districts = get_unique_districts(df, district_col, state_col, selected_state)
+    available_districts = get_unique_districts(df, district_col, state_col, selected_state, df_key)
     
     if not available_districts:
         st.warning(f"No districts found for {selected_state}")
@@ -410,33 +647,30 @@ def render_suspect_browse_section(df: pd.DataFrame, district_col: str, state_col
     
     # Filter by BOTH state and district
     with st.spinner("Filtering..."):
-        filtered_df = filter_by_two_columns(df, state_col, selected_state, district_col, selected_district)
+        filtered_df = filter_by_two_columns(df, state_col, selected_state, district_col, selected_district, df_key)
     
     if len(filtered_df) > 0:
         st.success(f"✅ Found **{len(filtered_df):,} records** for {selected_district}, {selected_state}")
         
-        with st.expander(f"Preview {selected_district} Data", expanded=False):
-            st.dataframe(filtered_df.head(10), use_container_width=True)
+        render_preview(f"Preview {selected_district} Data", filtered_df, 10, key="suspect_district_preview_tab2")
         
-        excel_bytes = generate_excel_bytes(filtered_df)
-        st.download_button(
+        render_download_button(
+            filtered_df,
             label=f"⬇️ Download {selected_district} ({selected_state}) Data ({len(filtered_df):,} records)",
-            data=excel_bytes,
-            file_name=f"suspect_{selected_state.replace(' ', '_')}_{selected_district.replace(' ', '_')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True,
-            type="primary"
+            file_stem=f"suspect_{selected_state.replace(' ', '_')}_{selected_district.replace(' ', '_')}",
+            key="suspect_district_download_tab2",
+            primary=True
         )
     else:
         st.warning(f"⚠️ No records found for {selected_district} in {selected_state}")
 
 
-def render_suspect_search_section(df: pd.DataFrame, district_col: str):
+def render_suspect_search_section(df: pd.DataFrame, district_col: str, df_key: str):
     """Render search district section."""
     st.markdown("### Search Any District")
     
     # Get all unique districts from file
-    all_districts_in_file = get_unique_districts(df, district_col)
+    all_districts_in_file = get_unique_districts(df, district_col, df_key=df_key)
     
     st.info(f"**{len(all_districts_in_file)}** unique districts in your file")
     
@@ -470,22 +704,19 @@ def render_suspect_search_section(df: pd.DataFrame, district_col: str):
     
     # Filter by district
     with st.spinner("Filtering..."):
-        filtered_df = filter_by_column(df, district_col, selected_district)
+        filtered_df = filter_by_column(df, district_col, selected_district, df_key)
     
     if len(filtered_df) > 0:
         st.success(f"✅ Found **{len(filtered_df):,} records** for {selected_district}")
         
-        with st.expander(f"Preview {selected_district} Data", expanded=False):
-            st.dataframe(filtered_df.head(10), use_container_width=True)
+        render_preview(f"Preview {selected_district} Data", filtered_df, 10, key="suspect_search_preview_tab2")
         
-        excel_bytes = generate_excel_bytes(filtered_df)
-        st.download_button(
+        render_download_button(
+            filtered_df,
             label=f"⬇️ Download {selected_district} Data ({len(filtered_df):,} records)",
-            data=excel_bytes,
-            file_name=f"suspect_{selected_district.replace(' ', '_')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True,
-            type="primary"
+            file_stem=f"suspect_{selected_district.replace(' ', '_')}",
+            key="suspect_search_download_tab2",
+            primary=True
         )
     else:
         st.warning(f"⚠️ No records found for {selected_district}")
@@ -530,19 +761,16 @@ def render_match_tab():
     
     # Read both files
     with st.spinner("Loading suspect file..."):
-        suspect_df = read_file_cached(suspect_file.getvalue(), suspect_file.name)
+        suspect_df, suspect_file_hash = load_uploaded_file(suspect_file, "match_suspect_file_loaded")
     st.success(f"✅ Suspect file loaded: **{len(suspect_df):,}** rows")
     
     with st.spinner("Loading victim file..."):
-        victim_df = read_file_cached(victim_file.getvalue(), victim_file.name)
+        victim_df, victim_file_hash = load_uploaded_file(victim_file, "match_victim_file_loaded")
     st.success(f"✅ Victim file loaded: **{len(victim_df):,}** rows")
     
     # Preview both files
-    with st.expander("📋 Preview Suspect Data", expanded=False):
-        st.dataframe(suspect_df.head(), use_container_width=True)
-    
-    with st.expander("📋 Preview Victim Data", expanded=False):
-        st.dataframe(victim_df.head(), use_container_width=True)
+    render_preview("📋 Preview Suspect Data", suspect_df, 5, key="match_suspect_preview")
+    render_preview("📋 Preview Victim Data", victim_df, 5, key="match_victim_preview")
     
     st.markdown("---")
     st.subheader("Step 2: Map Columns")
@@ -628,6 +856,10 @@ def render_match_tab():
         
         # Store in session state
         st.session_state['matched_df'] = result_df
+        st.session_state['matched_key'] = ":".join([
+            "match", suspect_file_hash, victim_file_hash,
+            suspect_ack_col, victim_ack_col, victim_district_col, victim_state_col, victim_amount_col
+        ])
         st.session_state['matched_suspect_district_col'] = suspect_district_col
         st.session_state['matched_suspect_state_col'] = suspect_state_col
         
@@ -647,12 +879,12 @@ def render_match_results():
     result_df = st.session_state['matched_df']
     suspect_district_col = st.session_state['matched_suspect_district_col']
     suspect_state_col = st.session_state['matched_suspect_state_col']
+    matched_key = st.session_state['matched_key']
     
     st.markdown("---")
     st.subheader("Step 4: Download District Wise Data")
     
-    with st.expander("📋 Preview Matched Data", expanded=False):
-        st.dataframe(result_df.head(10), use_container_width=True)
+    render_preview("📋 Preview Matched Data", result_df, 10, key="match_result_preview")
     
     # Amount Filter
     st.markdown("#### � Filnter by Reported Amount")
@@ -676,18 +908,18 @@ def render_match_results():
         filtered_df = filtered_df.drop(columns=['_amount_numeric'])
         
         st.info(f"Filtered: **{len(filtered_df):,}** records with Reported Amount ≥ ₹{min_amount:,}")
+        filtered_key = f"{matched_key}:min{min_amount}"
     else:
         filtered_df = result_df
+        filtered_key = matched_key
     
     # Download all matched data
     st.markdown("#### 📦 Download All Matched Data")
-    excel_bytes = generate_excel_bytes(filtered_df)
-    st.download_button(
+    render_download_button(
+        filtered_df,
         label=f"⬇️ Download All Matched Data ({len(filtered_df):,} records)",
-        data=excel_bytes,
-        file_name="matched_victim_suspect_all.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        use_container_width=True
+        file_stem="matched_victim_suspect_all",
+        key="match_download_all"
     )
     
     st.markdown("---")
@@ -697,7 +929,7 @@ def render_match_results():
     st.caption(f"Using State column: **{suspect_state_col}** | District column: **{suspect_district_col}**")
     
     # Get available states from filtered data
-    available_states = get_unique_states(filtered_df, suspect_state_col)
+    available_states = get_unique_states(filtered_df, suspect_state_col, filtered_key)
     
     if not available_states:
         st.warning("No states found in matched data")
@@ -715,23 +947,23 @@ def render_match_results():
         return
     
     # Download all state data
-    state_data = filter_by_column(filtered_df, suspect_state_col, selected_state)
+    state_data = filter_by_column(filtered_df, suspect_state_col, selected_state, filtered_key)
     
     if len(state_data) > 0:
         st.success(f"Found **{len(state_data):,} records** for {selected_state}")
         
-        excel_bytes = generate_excel_bytes(state_data)
-        st.download_button(
+        render_download_button(
+            state_data,
             label=f"⬇️ Download ALL {selected_state} Matched Data ({len(state_data):,} records)",
-            data=excel_bytes,
-            file_name=f"matched_{selected_state.replace(' ', '_')}_ALL.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
+            file_stem=f"matched_{selected_state.replace(' ', '_')}_ALL",
+            key="match_state_download"
         )
         
         # District selection
         st.markdown("---")
-        available_districts = get_unique_districts(filtered_df, suspect_district_col, suspect_state_col, selected_state)
+        available_districts = get_unique_districts(
+            filtered_df, suspect_district_col, suspect_state_col, selected_state, filtered_key
+        )
         
         if available_districts:
             st.info(f"Found **{len(available_districts)}** districts in {selected_state}")
@@ -745,23 +977,20 @@ def render_match_results():
             if selected_district != "-- Select District --":
                 district_data = filter_by_two_columns(
                     filtered_df, suspect_state_col, selected_state,
-                    suspect_district_col, selected_district
+                    suspect_district_col, selected_district, filtered_key
                 )
                 
                 if len(district_data) > 0:
                     st.success(f"Found **{len(district_data):,} records** for {selected_district}, {selected_state}")
                     
-                    with st.expander(f"Preview {selected_district} Data", expanded=False):
-                        st.dataframe(district_data.head(10), use_container_width=True)
+                    render_preview(f"Preview {selected_district} Data", district_data, 10, key="match_district_preview")
                     
-                    excel_bytes = generate_excel_bytes(district_data)
-                    st.download_button(
+                    render_download_button(
+                        district_data,
                         label=f"⬇️ Download {selected_district} ({selected_state}) Matched Data ({len(district_data):,} records)",
-                        data=excel_bytes,
-                        file_name=f"matched_{selected_state.replace(' ', '_')}_{selected_district.replace(' ', '_')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True,
-                        type="primary"
+                        file_stem=f"matched_{selected_state.replace(' ', '_')}_{selected_district.replace(' ', '_')}",
+                        key="match_district_download",
+                        primary=True
                     )
                 else:
                     st.warning(f"No records found for {selected_district}")
@@ -797,12 +1026,11 @@ def render_remove_duplicates_tab():
     
     # Read file
     with st.spinner("Loading file..."):
-        df = read_file_cached(uploaded_file.getvalue(), uploaded_file.name)
+        df, _ = load_uploaded_file(uploaded_file, "dedup_file_loaded")
     
     st.success(f"✅ File loaded: **{len(df):,}** rows, **{len(df.columns)}** columns")
     
-    with st.expander("📋 Preview Data (First 5 rows)", expanded=False):
-        st.dataframe(df.head(), use_container_width=True)
+    render_preview("📋 Preview Data (First 5 rows)", df, 5, key="dedup_preview")
     
     st.markdown("---")
     st.subheader("🔧 Select Columns")
@@ -911,8 +1139,7 @@ def render_remove_duplicates_tab():
             st.metric("Duplicates Removed", f"{stats['removed']:,}")
         
         # Preview
-        with st.expander("📋 Preview Deduplicated Data", expanded=True):
-            st.dataframe(result_df.head(20), use_container_width=True)
+        render_preview("📋 Preview Deduplicated Data", result_df, 20, key="dedup_result_preview", expanded=True)
         
         # Download
         st.markdown("---")
@@ -921,10 +1148,9 @@ def render_remove_duplicates_tab():
         download_col1, download_col2 = st.columns(2)
         
         with download_col1:
-            excel_bytes = generate_excel_bytes(result_df)
             st.download_button(
                 label=f"⬇️ Download Excel ({stats['after']:,} records)",
-                data=excel_bytes,
+                data=lambda: generate_excel_bytes(result_df),
                 file_name=f"deduplicated_by_ack_{stats['after']}_records.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 use_container_width=True,
@@ -932,10 +1158,9 @@ def render_remove_duplicates_tab():
             )
         
         with download_col2:
-            csv_bytes = result_df.to_csv(index=False).encode('utf-8')
             st.download_button(
                 label=f"⬇️ Download CSV ({stats['after']:,} records)",
-                data=csv_bytes,
+                data=lambda: generate_csv_bytes(result_df),
                 file_name=f"deduplicated_by_ack_{stats['after']}_records.csv",
                 mime="text/csv",
                 use_container_width=True
@@ -8,13 +8,12 @@ import pandas as pd
 from io import BytesIO
 from typing import List, Tuple
 
+from src.file_readers import EXCEL_READ_ENGINE, write_streamed_workbook
+
 
 def generate_merged_excel(df: pd.DataFrame) -> bytes:
-    """Generate Excel file bytes from DataFrame."""
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Merged Data')
-    return output.getvalue()
+    """Generate Excel file bytes for the merged data."""
+    return write_streamed_workbook(df, 'Merged Data')
 
 
 def generate_merged_csv(df: pd.DataFrame) -> bytes:
@@ -22,13 +21,20 @@ def generate_merged_csv(df: pd.DataFrame) -> bytes:
     return df.to_csv(index=False).encode('utf-8')
 
 
-def read_file(uploaded_file) -> pd.DataFrame:
-    """Read uploaded Excel/CSV file."""
-    filename = uploaded_file.name.lower()
+@st.cache_data(show_spinner=False, max_entries=8)
+def read_file_cached(file_content: bytes, filename: str) -> pd.DataFrame:
+    """Parse uploaded file bytes once; re-adding a removed file skips parsing."""
+    buffer = BytesIO(file_content)
     if filename.endswith('.csv'):
-        return pd.read_csv(uploaded_file)
+        return pd.read_csv(buffer)
     else:
-        return pd.read_excel(uploaded_file)
+        # calamine is much faster than openpyxl when python-calamine is installed
+        return pd.read_excel(buffer, engine=EXCEL_READ_ENGINE)
+
+
+def read_file(uploaded_file) -> pd.DataFrame:
+    """Read uploaded Excel/CSV file."""
+    return read_file_cached(uploaded_file.getvalue(), uploaded_file.name.lower())
 
 
 def render_excel_merger_page():
@@ -135,10 +141,10 @@ def render_excel_merger_page():
             download_col1, download_col2 = st.columns(2)
             
             with download_col1:
-                excel_bytes = generate_merged_excel(combined_df)
+                # Built only when clicked, not on every rerun
                 st.download_button(
                     label=f"📊 Download Excel ({len(combined_df)} rows)",
-                    data=excel_bytes,
+                    data=lambda: generate_merged_excel(combined_df),
                     file_name="merged_data.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     use_container_width=True,
@@ -146,10 +152,9 @@ def render_excel_merger_page():
                 )
             
             with download_col2:
-                csv_bytes = generate_merged_csv(combined_df)
                 st.download_button(
                     label=f"📄 Download CSV ({len(combined_df)} rows)",
-                    data=csv_bytes,
+                    data=lambda: generate_merged_csv(combined_df),
                     file_name="merged_data.csv",
                     mime="text/csv",
                     use_container_width=True
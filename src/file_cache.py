@@ -0,0 +1,54 @@
+"""
+Disk cache housekeeping for pages that keep files on disk.
+
+A file's modification time is its last use: mark_used refreshes it on a
+cache hit and evict_files deletes by it.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+
+def mark_used(path: Path) -> None:
+    """Record a cache hit on path so eviction treats it as recently used."""
+    os.utime(path)
+
+
+def evict_files(
+    directory: Path,
+    pattern: str,
+    max_bytes: int,
+    max_age_seconds: float,
+    keep: Optional[Path] = None
+) -> None:
+    """
+    Delete expired files, then the least recently used past a size cap.
+    
+    Args:
+        directory: Cache directory to clean.
+        pattern: Glob for the cache files in directory.
+        max_bytes: Total size the remaining files may use.
+        max_age_seconds: Files unused for longer than this are deleted.
+        keep: File that is never deleted, e.g. the one just written.
+    """
+    expires = time.time() - max_age_seconds
+    entries = []
+    for entry in directory.glob(pattern):
+        try:
+            info = entry.stat()
+        except FileNotFoundError:
+            continue
+        if info.st_mtime < expires and entry != keep:
+            entry.unlink(missing_ok=True)
+            continue
+        entries.append((info.st_mtime, info.st_size, entry))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries, key=lambda item: item[0]):
+        if total <= max_bytes:
+            break
+        if entry != keep:
+            entry.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,106 @@
+"""
+Shared readers and writers for uploaded and downloaded Excel/CSV files.
+
+Contains the Excel engine selection, the all-text Arrow CSV reader used
+by the upload pages and the streamed Excel writer used by their downloads.
+"""
+
+from io import BytesIO
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import xlsxwriter
+
+try:
+    import python_calamine  # noqa: F401
+    # calamine is much faster than openpyxl when python-calamine is installed
+    EXCEL_READ_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_READ_ENGINE = None
+
+# pandas' default NA strings, so the Arrow reader nulls the same cells read_csv would
+CSV_NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+
+def read_csv_as_text(buffer: BytesIO) -> pd.DataFrame:
+    """
+    Read a CSV with every column as text using Arrow's multithreaded parser.
+    Column names come from pandas so duplicates are de-duplicated the same way;
+    files Arrow rejects (e.g. ragged rows) fall back to pd.read_csv.
+    """
+    header = list(pd.read_csv(buffer, nrows=0).columns)
+    buffer.seek(0)
+    try:
+        table = pa_csv.read_csv(
+            buffer,
+            read_options=pa_csv.ReadOptions(column_names=header, skip_rows=1),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.string() for col in header},
+                null_values=CSV_NULL_VALUES,
+                strings_can_be_null=True
+            )
+        )
+    except pa.ArrowInvalid:
+        buffer.seek(0)
+        return pd.read_csv(buffer, low_memory=False, dtype=str)
+    return table.to_pandas()
+
+
+# Excel sheet limit is 1,048,576 rows, one of which is the header
+MAX_EXCEL_DATA_ROWS = 1_048_575
+
+
+def write_streamed_workbook(
+    df: pd.DataFrame,
+    sheet_name: str,
+    extra_sheets: Optional[Dict[str, List[list]]] = None
+) -> bytes:
+    """
+    Generate Excel file bytes with xlsxwriter in constant_memory mode.
+    
+    Rows are streamed in order, so peak memory stays at about one row.
+    Frames over the sheet limit are split into {sheet_name}_Part_N sheets.
+    
+    Args:
+        df: Data to write, one header row then one row per record.
+        sheet_name: Name of the data sheet.
+        extra_sheets: Further sheets to add after the data, as rows by sheet name.
+        
+    Returns:
+        The workbook as bytes.
+    """
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        # Same date display pandas' to_excel used for datetime cells
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        # Infinite values become #DIV/0! cells instead of failing the export
+        'nan_inf_to_errors': True,
+    })
+    
+    header = [str(col) for col in df.columns]
+    values = df.astype(object).where(df.notna(), None)
+    split = len(df) > MAX_EXCEL_DATA_ROWS
+    
+    for start in range(0, max(len(df), 1), MAX_EXCEL_DATA_ROWS):
+        name = f"{sheet_name}_Part_{(start // MAX_EXCEL_DATA_ROWS) + 1}" if split else sheet_name
+        worksheet = workbook.add_worksheet(name)
+        worksheet.write_row(0, 0, header)
+        chunk = values.iloc[start:start + MAX_EXCEL_DATA_ROWS]
+        for row_num, row in enumerate(chunk.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(row_num, 0, row)
+    
+    for name, rows in (extra_sheets or {}).items():
+        worksheet = workbook.add_worksheet(name)
+        for row_num, row in enumerate(rows):
+            worksheet.write_row(row_num, 0, row)
+    
+    workbook.close()
+    return output.getvalue()
@@ -11,8 +11,18 @@ Features:
 import streamlit as st
 import pandas as pd
 import io
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from typing import List, Dict, Optional, Tuple
 
+from src.file_readers import (
+    EXCEL_READ_ENGINE,
+    MAX_EXCEL_DATA_ROWS,
+    read_csv_as_text,
+    write_streamed_workbook,
+)
+
 
 def auto_detect_columns(df: pd.DataFrame) -> Dict[str, str]:
     """Auto-detect column mappings based on column names."""
@@ -74,14 +84,32 @@ def auto_detect_columns(df: pd.DataFrame) -> Dict[str, str]:
     return columns_map
 
 
-def read_excel_optimized(uploaded_file) -> pd.DataFrame:
-    """Read Excel file with optimization for large files."""
-    filename = uploaded_file.name.lower()
-    
+# One entry per file the page accepts at once
+@st.cache_data(show_spinner=False, max_entries=15)
+def read_file_cached(file_content: bytes, filename: str) -> pd.DataFrame:
+    """Parse uploaded file bytes once; processing the same files again skips parsing."""
+    buffer = io.BytesIO(file_content)
     if filename.endswith('.csv'):
-        return pd.read_csv(uploaded_file, low_memory=False, dtype=str)
+        return read_csv_as_text(buffer)
     else:
-        return pd.read_excel(uploaded_file, dtype=str)
+        # calamine is much faster than openpyxl when python-calamine is installed
+        return pd.read_excel(buffer, engine=EXCEL_READ_ENGINE, dtype=str)
+
+
+def read_excel_optimized(uploaded_file) -> pd.DataFrame:
+    """Read Excel file with optimization for large files."""
+    return read_file_cached(uploaded_file.getvalue(), uploaded_file.name.lower())
+
+
+def _parse_amount(series: pd.Series) -> pd.Series:
+    """Parse an amount column to numbers; unparseable values become 0."""
+    # Amounts repeat heavily: clean and parse each distinct value once and
+    # broadcast back through the factorize codes
+    codes, uniques = pd.factorize(series.astype(str))
+    cleaned = pd.Series(uniques, dtype=str).str.replace(',', '', regex=False).str.strip()
+    values = pd.to_numeric(cleaned, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    parsed = np.where(codes >= 0, values[codes] if len(values) else 0.0, 0.0)
+    return pd.Series(parsed, index=series.index)
 
 
 def process_single_file(uploaded_file, file_index: int) -> Tuple[Optional[pd.DataFrame], str]:
@@ -90,8 +118,8 @@ def process_single_file(uploaded_file, file_index: int) -> Tuple[Optional[pd.Dat
         df = read_excel_optimized(uploaded_file)
         original_cols = list(df.columns)
         
-        # Auto-detect columns
-        columns_map = auto_detect_columns(df.copy())
+        # Auto-detect columns (only the names are used; no need to copy the rows)
+        columns_map = auto_detect_columns(df.iloc[:0].copy())
         
         # Check required columns
         required = {'account_no', 'transaction_amount'}
@@ -105,10 +133,7 @@ def process_single_file(uploaded_file, file_index: int) -> Tuple[Optional[pd.Dat
         
         # Required columns
         data['Account No.'] = df[columns_map['account_no']].astype(str).str.strip()
-        data['Transaction Amount'] = pd.to_numeric(
-            df[columns_map['transaction_amount']].astype(str).str.replace(',', '').str.strip(),
-            errors='coerce'
-        ).fillna(0)
+        data['Transaction Amount'] = _parse_amount(df[columns_map['transaction_amount']])
         
         # Optional columns
         if 'ack_no' in columns_map:
@@ -117,10 +142,7 @@ def process_single_file(uploaded_file, file_index: int) -> Tuple[Optional[pd.Dat
             data['Acknowledgement No.'] = ''
         
         if 'disputed_amount' in columns_map:
-            data['Disputed Amount'] = pd.to_numeric(
-                df[columns_map['disputed_amount']].astype(str).str.replace(',', '').str.strip(),
-                errors='coerce'
-            ).fillna(0)
+            data['Disputed Amount'] = _parse_amount(df[columns_map['disputed_amount']])
         else:
             data['Disputed Amount'] = 0
         
@@ -149,12 +171,11 @@ def process_single_file(uploaded_file, file_index: int) -> Tuple[Optional[pd.Dat
         else:
             data['Address'] = ''
         
-        # Remove rows with no transaction amount
-        data = data[data['Transaction Amount'] != 0]
-        
-        # Remove rows with empty account numbers
-        data = data[data['Account No.'].str.strip() != '']
-        data = data[data['Account No.'] != 'nan']
+        # Remove rows with no transaction amount or an empty account number
+        # (already stripped above), in one boolean mask and one row selection
+        account = data['Account No.']
+        mask = (data['Transaction Amount'] != 0) & (account != '') & (account != 'nan')
+        data = data[mask]
         
         return data, f"✅ {len(data):,} valid rows"
         
@@ -162,30 +183,96 @@ def process_single_file(uploaded_file, file_index: int) -> Tuple[Optional[pd.Dat
         return None, f"❌ Error: {str(e)}"
 
 
-def aggregate_data(combined_df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate data by account number - OPTIMIZED."""
+# Columns identifying one account in the summary
+GROUP_KEYS = ['Account No.', 'Bank Name', 'IFSC Code']
+
+# Columns a partial aggregate keeps distinct values of
+PARTIAL_KEYS = GROUP_KEYS + ['Acknowledgement No.', 'District', 'State', 'Address']
+
+
+def partial_aggregate(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse rows to one per distinct (account, ACK, district, state, address).
+    
+    Each row carries the amount sums and the number of rows it stands for,
+    in first-seen order. That is everything the summary needs, so partials
+    of several files can be concatenated and passed to aggregate_partials
+    instead of concatenating the files themselves.
+    """
+    return data.groupby(PARTIAL_KEYS, dropna=False, sort=False).agg(**{
+        'Transaction Amount': ('Transaction Amount', 'sum'),
+        'Disputed Amount': ('Disputed Amount', 'sum'),
+        'Transaction Count': ('Transaction Amount', 'size'),
+    }).reset_index()
+
+
+def _group_mode(partials: pd.DataFrame, group_ids: np.ndarray, n_groups: int, column: str) -> np.ndarray:
+    """
+    Most frequent non-null value of column per account group ('' if none).
+    
+    Sums the row counts of each (group, value) pair and keeps the top row per
+    group; ties go to the smallest value, as Series.mode() does.
+    """
+    pairs = pd.DataFrame({
+        '_group': group_ids,
+        column: partials[column].to_numpy(),
+        'Transaction Count': partials['Transaction Count'].to_numpy(),
+    }).dropna(subset=[column])
+    counts = pairs.groupby(['_group', column])['Transaction Count'].sum().reset_index()
+    counts = counts.sort_values(['Transaction Count', column], ascending=[False, True], kind='stable')
+    modes = counts.drop_duplicates('_group').set_index('_group')[column]
+    return modes.reindex(range(n_groups), fill_value='').to_numpy()
+
+
+def _group_ack_numbers(partials: pd.DataFrame, group_ids: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    ';'-joined unique ACK numbers per account group, in first-seen order.
+    
+    The (group, ACK) pairs are de-duplicated once, collected into one list
+    per group by Arrow (input order kept with use_threads=False) and joined
+    with a single string kernel.
+    """
+    pairs = pd.DataFrame({
+        '_group': group_ids,
+        'Acknowledgement No.': partials['Acknowledgement No.'].to_numpy(),
+    }).dropna(subset=['Acknowledgement No.']).drop_duplicates()
+    table = pa.table({
+        '_group': pa.array(pairs['_group'].to_numpy(), type=pa.int64()),
+        'Acknowledgement No.': pa.array(pairs['Acknowledgement No.'].to_numpy(dtype=object), type=pa.string()),
+    })
+    grouped = table.group_by('_group', use_threads=False).aggregate([('Acknowledgement No.', 'list')])
+    joined = pc.binary_join(grouped['Acknowledgement No._list'], ';')
+    
+    acks = pd.Series(joined.to_pandas().to_numpy(), index=grouped['_group'].to_numpy())
+    return acks.reindex(range(n_groups), fill_value='').to_numpy()
+
+
+def aggregate_partials(partials: pd.DataFrame) -> pd.DataFrame:
+    """Build the account summary from concatenated partial_aggregate frames."""
     
     # Group by Account No., Bank Name, IFSC Code
-    grouped = combined_df.groupby(['Account No.', 'Bank Name', 'IFSC Code'], dropna=False)
+    grouped = partials.groupby(GROUP_KEYS, dropna=False)
     
-    # Aggregations
-    summary = grouped.agg({
-        'Acknowledgement No.': lambda x: ';'.join(x.dropna().unique()),
-        'Transaction Amount': 'sum',
-        'Disputed Amount': 'sum',
-        'District': lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else '',
-        'State': lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else '',
-        'Address': lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else ''
-    }).reset_index()
+    # Built-in aggregations only; no per-group Python callbacks
+    summary = grouped[['Transaction Amount', 'Disputed Amount', 'Transaction Count']].sum().reset_index()
     
-    # Add transaction count
-    txn_counts = grouped.size().reset_index(name='Transaction Count')
-    summary = summary.merge(txn_counts, on=['Account No.', 'Bank Name', 'IFSC Code'])
+    # Per-group results are placed by group number, not by key tuple, so
+    # accounts with a blank (NaN) bank name or IFSC code line up too
+    group_ids = grouped.ngroup().to_numpy()
+    n_groups = len(summary)
     
-    # Count distinct ACK numbers
-    summary['Distinct ACK Count'] = summary['Acknowledgement No.'].apply(
-        lambda x: len(set(x.split(';'))) if x else 0
-    )
+    summary['Acknowledgement No.'] = _group_ack_numbers(partials, group_ids, n_groups)
+    
+    for col in ['District', 'State', 'Address']:
+        summary[col] = _group_mode(partials, group_ids, n_groups, col)
+    
+    # Count distinct ACK numbers: the joined values are already unique, so
+    # it is the separator count plus one, unless an ACK itself contains ';'
+    acks = summary['Acknowledgement No.']
+    if partials['Acknowledgement No.'].dropna().astype(str).str.contains(';', regex=False).any():
+        summary['Distinct ACK Count'] = acks.apply(lambda x: len(set(x.split(';'))) if x else 0)
+    else:
+        summary['Distinct ACK Count'] = np.where(acks != '', acks.str.count(';') + 1, 0)
     
     # Reorder columns
     summary = summary[[
@@ -200,6 +287,19 @@ def aggregate_data(combined_df: pd.DataFrame) -> pd.DataFrame:
     return summary
 
 
+def aggregate_data(combined_df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate data by account number - OPTIMIZED."""
+    return aggregate_partials(partial_aggregate(combined_df))
+
+
+def generate_summary_excel(summary: pd.DataFrame) -> bytes:
+    """
+    Generate Excel file bytes for the account summary.
+    Summaries over the sheet limit are split into Summary_Part_N sheets.
+    """
+    return write_streamed_workbook(summary, 'Summary')
+
+
 def render_merge_files_page():
     """Render the Merge Excel Files page."""
     st.title("📂 Merge Excel Files")
@@ -245,8 +345,10 @@ def render_merge_files_page():
             st.warning("⚠️ Maximum 15 files allowed. Please remove some files.")
             return
         
-        # Process each file
-        all_data = []
+        # Process each file, keeping only its partial aggregate so the
+        # file rows are never concatenated into one frame
+        partials = []
+        total_rows = 0
         progress_bar = st.progress(0)
         status_text = st.empty()
         
@@ -258,14 +360,15 @@ def render_merge_files_page():
             
             if data is not None:
                 st.success(f"**{uploaded_file.name}**: {message}")
-                all_data.append(data)
+                partials.append(partial_aggregate(data))
+                total_rows += len(data)
             else:
                 st.error(f"**{uploaded_file.name}**: {message}")
         
         progress_bar.progress(100)
         status_text.text("Processing complete!")
         
-        if not all_data:
+        if not partials:
             st.error("❌ No valid data found in any uploaded files.")
             return
         
@@ -274,17 +377,15 @@ def render_merge_files_page():
         st.subheader("📊 Generating Summary...")
         
         with st.spinner("Merging and aggregating data..."):
-            combined_df = pd.concat(all_data, ignore_index=True)
-            st.info(f"Combined: **{len(combined_df):,}** total rows from {len(all_data)} file(s)")
+            st.info(f"Combined: **{total_rows:,}** total rows from {len(partials)} file(s)")
             
             # Aggregate
-            summary = aggregate_data(combined_df)
+            summary = aggregate_partials(pd.concat(partials, ignore_index=True))
         
         st.success(f"✅ Summary generated: **{len(summary):,}** unique accounts")
         
         # Store in session state
         st.session_state['merge_summary'] = summary
-        st.session_state['merge_combined'] = combined_df
     
     # Show results if available
     if 'merge_summary' in st.session_state:
@@ -320,24 +421,13 @@ def render_merge_files_page():
         col1, col2 = st.columns(2)
         
         with col1:
-            # Excel download
-            buffer = io.BytesIO()
-            MAX_ROWS = 1_048_576
-            MAX_DATA_ROWS = MAX_ROWS - 1
-            
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                if len(summary) > MAX_DATA_ROWS:
-                    st.warning("⚠️ Data too large for single sheet. Splitting...")
-                    for i in range(0, len(summary), MAX_DATA_ROWS):
-                        chunk = summary.iloc[i:i + MAX_DATA_ROWS]
-                        chunk.to_excel(writer, sheet_name=f"Summary_Part_{(i // MAX_DATA_ROWS) + 1}", index=False)
-                else:
-                    summary.to_excel(writer, sheet_name="Summary", index=False)
+            # Excel download (built only when clicked, not on every rerun)
+            if len(summary) > MAX_EXCEL_DATA_ROWS:
+                st.warning("⚠️ Data too large for single sheet. Splitting...")
             
-            buffer.seek(0)
             st.download_button(
                 label="📊 Download Excel",
-                data=buffer,
+                data=lambda: generate_summary_excel(summary),
                 file_name="merged_summary.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 use_container_width=True
@@ -359,6 +449,4 @@ def render_merge_files_page():
         if st.button("🔄 Clear & Start Over", use_container_width=True):
             if 'merge_summary' in st.session_state:
                 del st.session_state['merge_summary']
-            if 'merge_combined' in st.session_state:
-                del st.session_state['merge_combined']
             st.rerun()
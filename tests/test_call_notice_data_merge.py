@@ -0,0 +1,127 @@
+"""
+Tests for the Call Notice Data Merge matching.
+
+Covers column normalization dtypes and matching when a file has no
+usable mobile numbers or dates.
+"""
+
+import os
+import stat
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import call_notice_data_merge
+from src.call_notice_data_merge import (
+    compute_matches,
+    normalize_mobile_series,
+    parse_datetime_series,
+    persist_matches,
+    read_file_cached,
+)
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def make_files(phones1, phones2):
+    """File 1 (calls) and File 2 (entries) with the given phone columns."""
+    df1 = pd.DataFrame({
+        'Phone': phones1,
+        'Call Date': ['01-02-2024 10:00'] * len(phones1),
+    })
+    df2 = pd.DataFrame({
+        'Mobile': phones2,
+        'Entry Date': ['01-02-2024 12:30'] * len(phones2),
+        'ACK': [f'ACK{i}' for i in range(len(phones2))],
+    })
+    return df1, df2
+
+
+@pytest.fixture
+def match_dir(tmp_path, monkeypatch):
+    """Persist matches into a private directory under tmp_path."""
+    path = tmp_path / "matches"
+    path.mkdir(mode=0o700)
+    monkeypatch.setattr(call_notice_data_merge, '_match_cache_dir', path)
+    return path
+
+
+def match(df1, df2):
+    """Run compute_matches with the column names used by make_files."""
+    return compute_matches(df1, df2, 'Phone', 'Call Date', 'Mobile', 'Entry Date', 'ACK')
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+@pytest.mark.parametrize('values', [[], [None, None], [np.nan, np.nan]])
+def test_series_helpers_keep_dtype_for_blank_columns(values):
+    """All-blank columns keep a text mobile column and a datetime64 date column."""
+    series = pd.Series(values, dtype=object)
+    
+    assert normalize_mobile_series(series).dtype == object
+    assert pd.api.types.is_datetime64_any_dtype(parse_datetime_series(series))
+
+
+def test_file_with_zero_valid_mobiles_reports_no_matches():
+    """A File 1 with only blank phone numbers matches nothing instead of failing."""
+    df1, df2 = make_files([None, '', 'abc'], ['9876543210'])
+    
+    output_df, warnings, stats = match(df1, df2)
+    
+    assert len(output_df) == 0
+    assert stats['matched_count'] == 0
+    assert any('File 1: 3 records with invalid mobile numbers' in w for w in warnings)
+
+
+def test_matching_mobiles_report_time_difference():
+    """Normalized mobiles match across files and the time difference is computed."""
+    df1, df2 = make_files(['+91 98765 43210'], ['9876543210'])
+    
+    output_df, _, stats = match(df1, df2)
+    
+    assert stats['matched_count'] == 1
+    assert output_df.loc[0, 'Acknowledgement No.'] == 'ACK0'
+    assert output_df.loc[0, 'Time Difference'] == '2:30:00'
+
+
+@pytest.mark.parametrize('extra_call', [b'', b'9876543211,01-02-2024 10:00\n'])
+def test_csv_dates_parse_the_same_whatever_the_other_rows(extra_call):
+    """CSV dates are read as text, so one row's result does not depend on its neighbours."""
+    calls = b'Phone,Call Date\n9876543210,2024-02-01 10:00:00\n' + extra_call
+    entries = b'Mobile,Entry Date,ACK\n9876543210,2024-02-01 12:30:00,111\n'
+    df1 = read_file_cached(calls, 'calls.csv')
+    df2 = read_file_cached(entries, 'entries.csv')
+    
+    output_df, _, _ = match(df1, df2)
+    
+    assert output_df['Time Difference'].tolist() == ['2:30:00']
+    assert output_df.loc[0, 'Acknowledgement No.'] == '111'
+
+
+@pytest.mark.parametrize('file2_phones', [[], [None], ['12']])
+def test_file2_without_valid_mobiles_reports_no_matches(file2_phones):
+    """An empty or all-invalid File 2 gives zero matches and no average."""
+    df1, df2 = make_files(['9876543210'], file2_phones)
+    
+    output_df, _, stats = match(df1, df2)
+    
+    assert len(output_df) == 0
+    assert stats['avg_time_difference'] is None
+    assert stats['unmatched_file1'] == 1
+
+
+def test_persisted_matches_are_private(match_dir):
+    """Persisted results are 0o600 files in the match directory, reused by content."""
+    df = pd.DataFrame({'Acknowledgement No.': ['ACK0', 1]})
+    
+    path = persist_matches(df)
+    
+    assert os.path.dirname(path) == str(match_dir)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert persist_matches(df.copy()) == path
+    assert os.listdir(match_dir) == [os.path.basename(path)]
@@ -134,6 +134,23 @@ class TestHeaderNormalization:
         """Test that non-string input is converted to string."""
         result = column_detector.normalize_header(123)
         assert result == "123"
+    
+    def test_removes_non_ascii_characters(self, column_detector):
+        """Test that non-ASCII letters are removed and unicode spaces collapsed."""
+        result = column_detector.normalize_header("Bénéficiaire Bank_Name")
+        assert result == "bnficiaire bank name"
+    
+    def test_repeated_calls_return_same_result(self, column_detector):
+        """Test that cached normalization returns the same result on repeat calls."""
+        first = column_detector.normalize_header("Bank A/C No.")
+        second = column_detector.normalize_header("Bank A/C No.")
+        assert first == second == "bank a c no"
+    
+    def test_normalize_headers_matches_single(self, column_detector):
+        """Test that batch normalization matches per-header normalization."""
+        headers = ["Bank_Account-No", "  IFSC  ", 123, "Sr.No"]
+        expected = [column_detector.normalize_header(h) for h in headers]
+        assert column_detector.normalize_headers(headers) == expected
 
 
 # =============================================================================
@@ -336,6 +353,22 @@ class TestColumnDetection:
         assert mapping.confidence_scores["bank_account_number"] >= 0.8
         assert mapping.confidence_scores["amount"] >= 0.8
     
+    def test_flags_every_column_type_above_threshold(self, column_detector):
+        """Test that a header close to variants of two types is flagged ambiguous."""
+        mapping = column_detector.detect_columns(["bank code no"])
+        
+        assert mapping.ifsc_code == "bank code no"
+        assert sorted(mapping.ambiguous_mappings["bank code no"]) == [
+            "bank_account_number", "ifsc_code"
+        ]
+    
+    def test_substring_of_longer_header_does_not_match(self, column_detector):
+        """Test that a variant contained in a longer header is not a match."""
+        mapping = column_detector.detect_columns(["Txn Amount Value"])
+        
+        assert mapping.amount is None
+        assert mapping.confidence_scores == {}
+    
     def test_unmapped_headers(self, column_detector):
         """Test getting unmapped headers."""
         headers = ["Bank Account No", "Amount", "Unknown Column", "Random Field"]
@@ -370,3 +403,49 @@ class TestColumnDetection:
         missing = column_detector.validate_required_columns(mapping)
         
         assert "amount" in missing
+
+
+class TestMatchCaching:
+    """Unit tests for memoized header matching."""
+    
+    def test_repeated_header_is_served_from_cache(self, column_detector):
+        """Test that headers seen in an earlier file hit the match cache."""
+        column_detector.detect_columns(["Bank Account No", "Txn Amt", "IFSC"])
+        hits_before = column_detector._find_best_match.cache_info().hits
+        column_detector.detect_columns(["IFSC", "Txn Amt", "Bank Name"])
+        
+        assert column_detector._find_best_match.cache_info().hits == hits_before + 2
+    
+    def test_repeated_header_row_is_served_from_cache(self, column_detector):
+        """Test that an identical header row skips matching entirely."""
+        headers = ["Bank Account No", "Txn Amt", "IFSC"]
+        first = column_detector.detect_columns(headers)
+        match_calls = column_detector._find_best_match.cache_info()
+        second = column_detector.detect_columns(headers)
+        
+        assert column_detector._find_best_match.cache_info() == match_calls
+        assert column_detector._detect_assignments.cache_info().hits == 1
+        assert first == second
+    
+    def test_cached_mapping_is_not_shared(self, column_detector):
+        """Test that editing a returned mapping does not leak into later calls."""
+        headers = ["Bank Account No", "Amount"]
+        first = column_detector.detect_columns(headers)
+        first.amount = "Edited"
+        first.confidence_scores.clear()
+        
+        second = column_detector.detect_columns(headers)
+        
+        assert second.amount == "Amount"
+        assert second.confidence_scores["amount"] == 1.0
+    
+    def test_all_matches_is_immutable_tuple(self, column_detector):
+        """Test that cached match results cannot be mutated by callers."""
+        _, _, all_matches = column_detector._find_best_match("amount", "Amount")
+        assert isinstance(all_matches, tuple)
+    
+    def test_cache_clear(self, column_detector):
+        """Test that the match cache can be cleared."""
+        column_detector.detect_columns(["Amount"])
+        column_detector._find_best_match.cache_clear()
+        assert column_detector._find_best_match.cache_info().currsize == 0
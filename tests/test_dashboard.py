@@ -385,6 +385,20 @@ class TestCalculateStatistics:
         for i in range(len(stats.top_accounts_by_amount) - 1):
             assert stats.top_accounts_by_amount[i].total_amount >= \
                    stats.top_accounts_by_amount[i + 1].total_amount
+    
+    def test_top_accounts_ties_keep_input_order(self, dashboard):
+        """Test that accounts with equal amounts keep their input order."""
+        accounts = [
+            AggregatedAccount(f"ACC{i:03d}", "Bank", "IFSC", "Addr", "", "", 1, f"ACK{i}",
+                              float(i % 3), 0.0, 50.0)
+            for i in range(30)
+        ]
+        
+        stats = dashboard.calculate_statistics(accounts=accounts, total_input_rows=30)
+        
+        expected = sorted(accounts, key=lambda x: -x.total_amount)[:10]
+        assert stats.top_accounts_by_amount == expected
+        assert stats.total_fraud_amount == sum(acc.total_amount for acc in accounts)
 
 
 class TestSearchAccounts:
@@ -442,6 +456,50 @@ class TestFilterByMinTransactions:
         assert all(acc.total_transactions >= 5 for acc in results)
 
 
+class TestFilterAccounts:
+    """Unit tests for the fused filter_accounts method."""
+    
+    def test_combines_all_filters(self, dashboard):
+        """Test that search and minimum filters are applied together."""
+        accounts = [
+            AggregatedAccount("111222", "Bank1", "IFSC1", "Addr1", "", "", 5, "ACK1", 1000.0, 0.0, 50.0),
+            AggregatedAccount("111333", "Bank2", "IFSC2", "Addr2", "", "", 10, "ACK2", 5000.0, 0.0, 50.0),
+            AggregatedAccount("444111", "Bank3", "IFSC3", "Addr3", "", "", 2, "ACK3", 9000.0, 0.0, 50.0),
+            AggregatedAccount("555555", "Bank4", "IFSC4", "Addr4", "", "", 20, "ACK4", 9000.0, 0.0, 50.0),
+        ]
+        
+        results = dashboard.filter_accounts(
+            accounts, query="111", min_transactions=3, min_amount=2000.0
+        )
+        
+        assert results == [accounts[1]]
+    
+    def test_no_active_filters_returns_input(self, dashboard):
+        """Test that inactive filters return the input list unchanged."""
+        accounts = [
+            AggregatedAccount("111", "Bank1", "IFSC1", "Addr1", "", "", 1, "ACK1", 1000.0, 0.0, 50.0),
+        ]
+        
+        assert dashboard.filter_accounts(accounts, query="  ") is accounts
+    
+    def test_empty_accounts(self, dashboard):
+        """Test filtering an empty account list."""
+        assert dashboard.filter_accounts([], query="1", min_amount=10.0) == []
+    
+    def test_reuses_columns_for_same_list(self, dashboard):
+        """Test that the column view is cached per accounts list."""
+        accounts = [
+            AggregatedAccount("111", "Bank1", "IFSC1", "Addr1", "", "", 1, "ACK1", 1000.0, 0.0, 50.0),
+        ]
+        
+        columns = dashboard.set_accounts(accounts)
+        
+        assert dashboard._columns_for(accounts) is columns
+        assert dashboard._columns_for(list(accounts)) is not columns
+        assert columns.total_amounts.tolist() == [1000.0]
+        assert columns.account_numbers.to_pylist() == ["111"]
+
+
 class TestFilterByMinAmount:
     """Unit tests for filter_by_min_amount method."""
     
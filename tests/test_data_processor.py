@@ -342,6 +342,12 @@ class TestWhitespaceTrimming:
         result = data_processor.trim_whitespace(df)
         assert list(result['A']) == [1, 2, 3]
         assert result['B'].iloc[0] == 'text'
+    
+    def test_does_not_modify_input(self, data_processor):
+        """Test that the caller's DataFrame is left untouched."""
+        df = pd.DataFrame({'A': ['  value  '], 'B': [1]})
+        data_processor.trim_whitespace(df)
+        assert df['A'].iloc[0] == '  value  '
 
 
 # =============================================================================
@@ -466,3 +472,33 @@ class TestCleanDataFrame:
         # Check amounts parsed
         assert result['Amount'].iloc[0] == 10000.00
         assert result['Amount'].iloc[1] == 25000.00
+    
+    def test_does_not_modify_input(self, data_processor, sample_column_mapping):
+        """Test that cleaning leaves the caller's DataFrame untouched."""
+        df = pd.DataFrame({
+            'Bank Account No': ['1234 5678 9012'],
+            'Amount': ['₹10,000.00'],
+            'Bank Name': ['  SBI  ']
+        })
+        original = df.copy()
+        
+        data_processor.clean_dataframe(df, sample_column_mapping)
+        
+        pd.testing.assert_frame_equal(df, original)
+
+
+class TestParseAmountsVectorized:
+    """Unit tests for vectorized amount parsing."""
+    
+    def test_numeric_series_passthrough(self, data_processor):
+        """Test that numeric columns are converted without string cleaning."""
+        series = pd.Series([1000.5, None, 250])
+        result = data_processor.parse_amounts_vectorized(series)
+        assert result.tolist() == [1000.5, 0.0, 250.0]
+        assert result.dtype == 'float64'
+    
+    def test_mixed_plain_and_formatted_strings(self, data_processor):
+        """Test that plain numbers and currency-formatted strings both parse."""
+        series = pd.Series(['1500', '₹1,00,000.00', None, 'Rs. 500', 'abc', 42], dtype=object)
+        result = data_processor.parse_amounts_vectorized(series)
+        assert result.tolist() == [1500.0, 100000.0, 0.0, 500.0, 0.0, 42.0]
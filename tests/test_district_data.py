@@ -0,0 +1,57 @@
+"""
+Tests for the District Data parsed-upload disk cache.
+
+Covers the permissions of the cache directory and files.
+"""
+
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+from src import district_data
+
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'getuid'), reason="POSIX permissions")
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the upload cache at a fresh directory under tmp_path."""
+    path = tmp_path / "uploads"
+    monkeypatch.setattr(district_data, 'UPLOAD_CACHE_DIR', path)
+    return path
+
+
+def store(directory, name):
+    """Cache a small parsed upload under name and return its path."""
+    path = directory / f"{name}.feather"
+    district_data._store_parsed_file(directory, path, pd.DataFrame({'ACK': ['1', '2']}))
+    return path
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_cache_dir_and_files_are_private(cache_dir):
+    """The cache directory is created 0o700 and cached files are 0o600."""
+    directory = district_data._upload_cache_dir()
+    path = store(directory, 'a')
+    
+    assert directory == cache_dir
+    assert stat.S_IMODE(cache_dir.stat().st_mode) == 0o700
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+def test_shared_cache_dir_is_not_used(cache_dir):
+    """A directory other users can access is not used for the cache."""
+    cache_dir.mkdir(mode=0o777)
+    os.chmod(cache_dir, 0o777)
+    
+    assert district_data._upload_cache_dir() is None
@@ -0,0 +1,28 @@
+"""
+Tests for the Excel Merger export.
+
+Covers writing merged data with missing and infinite values to Excel.
+"""
+
+from io import BytesIO
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from src.excel_merger import generate_merged_excel
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_merged_excel_writes_missing_and_infinite_values():
+    """Missing cells stay blank and infinite values become error cells."""
+    df = pd.DataFrame({'Amount': [1.5, np.nan, np.inf], 'Name': ['a', None, 'c']})
+    
+    sheet = openpyxl.load_workbook(BytesIO(generate_merged_excel(df)))['Merged Data']
+    rows = [[cell.value for cell in row] for row in sheet.iter_rows(min_row=2)]
+    
+    # xlsxwriter writes inf as a formula that evaluates to #DIV/0!
+    assert rows == [[1.5, 'a'], [None, None], ['=1/0', 'c']]
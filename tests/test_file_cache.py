@@ -0,0 +1,56 @@
+"""
+Tests for disk cache eviction.
+
+Covers deleting expired files and trimming the cache to its size cap.
+"""
+
+import os
+import time
+
+from src.file_cache import evict_files, mark_used
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def make_file(directory, name, size, age_seconds):
+    """Write a cache file of size bytes last used age_seconds ago."""
+    path = directory / name
+    path.write_bytes(b'x' * size)
+    used = time.time() - age_seconds
+    os.utime(path, (used, used))
+    return path
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_expired_files_are_deleted(tmp_path):
+    """Files unused for longer than max_age_seconds go; the kept file always stays."""
+    old = make_file(tmp_path, 'old.cache', 1, 120)
+    kept = make_file(tmp_path, 'kept.cache', 1, 120)
+    new = make_file(tmp_path, 'new.cache', 1, 0)
+    other = make_file(tmp_path, 'other.txt', 1, 120)
+    
+    evict_files(tmp_path, '*.cache', max_bytes=100, max_age_seconds=60, keep=kept)
+    
+    assert not old.exists()
+    assert kept.exists()
+    assert new.exists()
+    assert other.exists()
+
+
+def test_least_recently_used_files_go_past_the_size_cap(tmp_path):
+    """Over the cap, files are deleted oldest use first until the rest fit."""
+    oldest = make_file(tmp_path, 'a.cache', 10, 30)
+    used = make_file(tmp_path, 'b.cache', 10, 20)
+    newest = make_file(tmp_path, 'c.cache', 10, 10)
+    mark_used(used)
+    
+    evict_files(tmp_path, '*.cache', max_bytes=20, max_age_seconds=3600)
+    
+    assert not oldest.exists()
+    assert used.exists()
+    assert newest.exists()
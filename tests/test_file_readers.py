@@ -0,0 +1,54 @@
+"""
+Tests for the shared upload readers and download writers.
+
+Covers the streamed Excel writer used by the download pages.
+"""
+
+from io import BytesIO
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from src import file_readers
+from src.file_readers import write_streamed_workbook
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def sheet_rows(data: bytes):
+    """Cell values of every sheet in a workbook, by sheet name."""
+    workbook = openpyxl.load_workbook(BytesIO(data))
+    return {
+        sheet.title: [[cell.value for cell in row] for row in sheet.iter_rows()]
+        for sheet in workbook.worksheets
+    }
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_writes_header_rows_and_extra_sheets():
+    """Missing cells stay blank, inf becomes an error cell and extra sheets follow the data."""
+    df = pd.DataFrame({'ACK': [1.0, np.inf], 'URL': ['http://x', None]})
+    
+    sheets = sheet_rows(write_streamed_workbook(df, 'Data', {'Summary': [['Total'], [2]]}))
+    
+    # xlsxwriter writes inf as a formula that evaluates to #DIV/0!
+    assert sheets == {
+        'Data': [['ACK', 'URL'], [1, 'http://x'], ['=1/0', None]],
+        'Summary': [['Total'], [2]],
+    }
+
+
+def test_splits_rows_over_the_sheet_limit(monkeypatch):
+    """Frames over the row limit are split into numbered part sheets with headers."""
+    monkeypatch.setattr(file_readers, 'MAX_EXCEL_DATA_ROWS', 2)
+    df = pd.DataFrame({'n': [1, 2, 3]})
+    
+    sheets = sheet_rows(write_streamed_workbook(df, 'Data'))
+    
+    assert sheets == {'Data_Part_1': [['n'], [1], [2]], 'Data_Part_2': [['n'], [3]]}
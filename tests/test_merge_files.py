@@ -0,0 +1,107 @@
+"""
+Tests for the Merge Excel Files aggregation.
+
+Covers account summaries built by aggregate_data and aggregate_partials,
+including accounts whose key columns are blank.
+"""
+
+from io import BytesIO
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from src.merge_files import (
+    aggregate_data,
+    aggregate_partials,
+    generate_summary_excel,
+    partial_aggregate,
+)
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def make_rows(**overrides) -> pd.DataFrame:
+    """Two transactions for one account, shaped like process_single_file output."""
+    rows = {
+        'Account No.': ['a', 'a'],
+        'Transaction Amount': [100.0, 50.0],
+        'Acknowledgement No.': ['k1', 'k2'],
+        'Disputed Amount': [10.0, 5.0],
+        'Bank Name': ['SBI', 'SBI'],
+        'IFSC Code': ['I', 'I'],
+        'District': ['d1', 'd1'],
+        'State': ['s1', 's1'],
+        'Address': ['x', 'x'],
+    }
+    rows.update(overrides)
+    return pd.DataFrame(rows)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+@pytest.mark.parametrize('blank_column', ['Bank Name', 'IFSC Code', 'Account No.'])
+def test_blank_key_column_keeps_account_details(blank_column):
+    """Accounts with a blank (NaN) key cell keep their ACKs and location."""
+    summary = aggregate_data(make_rows(**{blank_column: [np.nan, np.nan]}))
+    
+    assert len(summary) == 1
+    row = summary.iloc[0]
+    assert pd.isna(row[blank_column])
+    assert row['Acknowledgement No.'] == 'k1;k2'
+    assert row['Distinct ACK Count'] == 2
+    assert row['District'] == 'd1'
+    assert row['State'] == 's1'
+    assert row['Address'] == 'x'
+    assert row['Transaction Count'] == 2
+    assert row['Transaction Amount'] == 150.0
+
+
+def test_blank_and_filled_keys_stay_separate_accounts():
+    """A blank bank name is its own group, not merged into a named bank."""
+    rows = make_rows(**{'Bank Name': [np.nan, 'SBI'], 'District': ['d1', 'd2']})
+    summary = aggregate_data(rows).set_index('District')
+    
+    assert summary.loc['d1', 'Acknowledgement No.'] == 'k1'
+    assert summary.loc['d2', 'Acknowledgement No.'] == 'k2'
+
+
+def test_partials_match_single_aggregate():
+    """Summing per-file partials gives the same summary as one combined frame."""
+    first = make_rows(**{'IFSC Code': [np.nan, 'I']})
+    second = make_rows(**{
+        'Acknowledgement No.': ['k2', 'k3'],
+        'District': ['d2', 'd2'],
+        'IFSC Code': [np.nan, np.nan],
+    })
+    
+    combined = aggregate_data(pd.concat([first, second], ignore_index=True))
+    partials = pd.concat([partial_aggregate(first), partial_aggregate(second)], ignore_index=True)
+    
+    pd.testing.assert_frame_equal(aggregate_partials(partials), combined)
+
+
+def test_no_ack_numbers_counts_zero():
+    """Accounts without any ACK number get an empty list and a count of 0."""
+    summary = aggregate_data(make_rows(**{'Acknowledgement No.': [np.nan, np.nan]}))
+    
+    assert summary.loc[0, 'Acknowledgement No.'] == ''
+    assert summary.loc[0, 'Distinct ACK Count'] == 0
+
+
+def test_summary_excel_writes_infinite_amounts():
+    """Infinite amounts are exported as Excel error cells rather than raising."""
+    summary = aggregate_data(make_rows(**{'Transaction Amount': [np.inf, 50.0]}))
+    
+    sheet = openpyxl.load_workbook(BytesIO(generate_summary_excel(summary)))['Summary']
+    header = [cell.value for cell in sheet[1]]
+    amount = sheet.cell(row=2, column=header.index('Transaction Amount') + 1)
+    
+    # xlsxwriter writes inf as a formula that evaluates to #DIV/0!
+    assert amount.value == '=1/0'
+    assert sheet.cell(row=2, column=header.index('Transaction Count') + 1).value == 2